@@ -0,0 +1,345 @@
+import numpy as np
+import pandas as pd
+
+from config import DERIVED_BINS
+
+SUPPORTED_STATS = ('size', 'count', 'sum', 'mean', 'var', 'std')
+
+
+def dimension_codes(df, dim):
+    """Return integer codes (-1 for missing) and sorted levels for a grouping column"""
+    if dim in df.columns:
+        codes, levels = pd.factorize(df[dim], sort=True)
+        return codes, np.asarray(levels)
+    source, bins, labels = DERIVED_BINS[dim]
+    binned = pd.cut(df[source], bins=bins, labels=labels)
+    return binned.cat.codes.to_numpy(), np.asarray(labels, dtype=object)
+
+
+def factorize_key(df, key):
+    """
+    Factorize a group key (None, a column, or a tuple of columns) into group codes.
+    Rows with a missing key value get code -1 and are left out, like groupby.
+    Returns (codes, number of groups, index of the groups in sorted order).
+    """
+    if key is None:
+        return np.zeros(len(df), dtype=np.int64), 1, None
+    columns = [key] if isinstance(key, str) else list(key)
+    codes, levels = zip(*(dimension_codes(df, col) for col in columns))
+    if len(columns) == 1:
+        return codes[0], len(levels[0]), pd.Index(levels[0], name=columns[0])
+
+    valid = np.logical_and.reduce([c >= 0 for c in codes])
+    shape = tuple(len(lv) for lv in levels)
+    combined = np.ravel_multi_index([np.where(valid, c, 0) for c in codes], shape)
+    groups, inverse = np.unique(combined[valid], return_inverse=True)
+    group_codes = np.full(len(df), -1, dtype=np.int64)
+    group_codes[valid] = inverse
+    arrays = [lv[c] for lv, c in zip(levels, np.unravel_index(groups, shape))]
+    return group_codes, len(groups), pd.MultiIndex.from_arrays(arrays, names=columns)
+
+
+def _moments(codes, n_groups, values):
+    """
+    Per-group size, count, shifted sum and shifted sum of squares for every column
+    of a 2-D value array, each reduced with one bincount over (group, column) cells.
+    """
+    keep = codes >= 0
+    codes = codes[keep]
+    values = values[keep]
+    n_columns = values.shape[1]
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    shift = np.where(counts > 0, np.where(valid, values, 0.0).sum(axis=0) / np.maximum(counts, 1), 0.0)
+    centered = np.where(valid, values - shift, 0.0)
+    cells = (codes[:, None] * n_columns + np.arange(n_columns)).ravel()
+    reduce = lambda weights: np.bincount(cells, weights=weights.ravel(),
+                                         minlength=n_groups * n_columns).reshape(n_groups, n_columns)
+    size = np.bincount(codes, minlength=n_groups)
+    return size, reduce(valid.astype('float64')), reduce(centered), reduce(centered * centered), shift
+
+
+def finish_statistic(stat, size, count, total, squares, shift):
+    """Turn group moments (sums taken around `shift`) into the requested statistic"""
+    if stat not in SUPPORTED_STATS:
+        raise ValueError(f"Unsupported statistic: {stat}")
+    if stat == 'size':
+        return size.astype(np.int64)
+    if stat == 'count':
+        return count.astype(np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if stat == 'sum':
+            return total + shift * count
+        if stat == 'mean':
+            return np.where(count > 0, shift + total / count, np.nan)
+        var = (squares - total * total / count) / (count - 1)
+        var = np.where(count > 1, np.maximum(var, 0.0), np.nan)
+        return var if stat == 'var' else np.sqrt(var)
+
+
+def aggregate(df, requests):
+    """
+    Compute many (group key, column, statistic) requests in a single sweep.
+    Each key is factorized once and all of its columns are reduced together with
+    bincounts over the category codes, whatever statistics are asked of them. A None key aggregates the
+    whole frame and yields a scalar; other keys yield a Series like groupby.
+    """
+    requests = list(requests)
+    for _, _, stat in requests:
+        if stat not in SUPPORTED_STATS:
+            raise ValueError(f"Unsupported statistic: {stat}")
+
+    # Group the requested columns by key so each key is factorized and swept once
+    plan = {}
+    for key, column, _ in requests:
+        columns = plan.setdefault(key, [])
+        if column not in columns:
+            columns.append(column)
+
+    results = {}
+    for key, columns in plan.items():
+        codes, n_groups, index = factorize_key(df, key)
+        size, count, total, squares, shift = _moments(codes, n_groups,
+                                                      df[columns].to_numpy(dtype='float64'))
+        for request in requests:
+            if request[0] != key:
+                continue
+            i = columns.index(request[1])
+            value = finish_statistic(request[2], size, count[:, i], total[:, i], squares[:, i], shift[i])
+            if index is None:
+                results[request] = value[0]
+            else:
+                results[request] = pd.Series(value, index=index, name=request[1])
+    return results
+
+
+class MomentAccumulator:
+    """
+    Mergeable version of aggregate() for data that arrives in chunks or partitions.
+    Per group key it keeps the group labels seen so far and, per column, the size,
+    count, mean and sum of squared deviations of each group. Chunks are folded in
+    with aggregate()'s bincount sweep and combined with the parallel variance
+    update, so results do not depend on how the rows were split.
+    """
+
+    def __init__(self, requests):
+        self.requests = list(requests)
+        for _, _, stat in self.requests:
+            if stat not in SUPPORTED_STATS:
+                raise ValueError(f"Unsupported statistic: {stat}")
+        self.plan = {}
+        for key, column, _ in self.requests:
+            columns = self.plan.setdefault(key, [])
+            if column not in columns:
+                columns.append(column)
+        # key -> (labels, {label: position}, size, count, mean, m2)
+        self.groups = {key: ([], {}, np.zeros(0), np.zeros((0, len(columns))),
+                             np.zeros((0, len(columns))), np.zeros((0, len(columns))))
+                       for key, columns in self.plan.items()}
+
+    def update(self, df):
+        """Fold the rows of a DataFrame into the running group moments"""
+        for key, columns in self.plan.items():
+            codes, n_groups, index = factorize_key(df, key)
+            size, count, total, squares, shift = _moments(codes, n_groups,
+                                                          df[columns].to_numpy(dtype='float64'))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(count > 0, shift + total / count, 0.0)
+                m2 = np.where(count > 0, squares - total * total / count, 0.0)
+            labels = [None] if index is None else list(index)
+            self._combine(key, labels, size, count, mean, m2)
+        return self
+
+    def _combine(self, key, labels, size, count, mean, m2):
+        """Add per-group moments for the given labels into the totals of one key"""
+        known, positions, old_size, old_count, old_mean, old_m2 = self.groups[key]
+        for label in labels:
+            if label not in positions:
+                positions[label] = len(known)
+                known.append(label)
+        grow = len(known) - len(old_size)
+        if grow:
+            old_size = np.concatenate([old_size, np.zeros(grow)])
+            pad = np.zeros((grow, old_count.shape[1]))
+            old_count, old_mean, old_m2 = (np.concatenate([a, pad]) for a in (old_count, old_mean, old_m2))
+
+        target = np.array([positions[label] for label in labels], dtype=np.int64)
+        a_count, a_mean = old_count[target], old_mean[target]
+        n = a_count + count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta = mean - a_mean
+            new_mean = np.where(n > 0, a_mean + delta * count / n, 0.0)
+            new_m2 = np.where(n > 0, old_m2[target] + m2 + delta * delta * a_count * count / n, 0.0)
+        old_size[target] += size
+        old_count[target] = n
+        old_mean[target] = new_mean
+        old_m2[target] = new_m2
+        self.groups[key] = (known, positions, old_size, old_count, old_mean, old_m2)
+
+    def merge(self, other):
+        """Add another accumulator over the same requests into this one"""
+        if other.plan != self.plan:
+            raise ValueError("Cannot merge moment accumulators over different requests")
+        for key, (labels, _, size, count, mean, m2) in other.groups.items():
+            self._combine(key, labels, size, count, mean, m2)
+        return self
+
+    def state(self):
+        """Plain (JSON-ready) form of the running totals, restored by from_state()"""
+        return {
+            'requests': [[key if key is None or isinstance(key, str) else list(key), column, stat]
+                         for key, column, stat in self.requests],
+            'groups': [{'labels': [plain_label(label) for label in labels],
+                        'size': size.tolist(), 'count': count.tolist(), 'mean': mean.tolist(), 'm2': m2.tolist()}
+                       for labels, _, size, count, mean, m2 in self.groups.values()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator from state()"""
+        requests = [(key if key is None or isinstance(key, str) else tuple(key), column, stat)
+                    for key, column, stat in state['requests']]
+        accumulator = cls(requests)
+        for key, group in zip(accumulator.plan, state['groups']):
+            width = len(accumulator.plan[key])
+            labels = [label if key is None or isinstance(key, str) else tuple(label) for label in group['labels']]
+            count, mean, m2 = (np.array(group[name], dtype='float64').reshape(-1, width)
+                               for name in ('count', 'mean', 'm2'))
+            accumulator.groups[key] = (labels, {label: i for i, label in enumerate(labels)},
+                                       np.array(group['size'], dtype='float64'), count, mean, m2)
+        return accumulator
+
+    def results(self):
+        """Return the request results in the same form as aggregate()"""
+        results = {}
+        for key, columns in self.plan.items():
+            labels, _, size, count, mean, m2 = self.groups[key]
+            if key is None:
+                order, index = np.zeros(1, dtype=np.int64), None
+                if not labels:
+                    size, count, mean, m2 = (np.zeros((1,) + a.shape[1:]) for a in (size, count, mean, m2))
+            else:
+                order = np.array(sorted(range(len(labels)), key=labels.__getitem__), dtype=np.int64)
+                sorted_labels = [labels[i] for i in order]
+                if isinstance(key, str):
+                    index = pd.Index(sorted_labels, name=key)
+                else:
+                    index = pd.MultiIndex.from_tuples(sorted_labels, names=list(key))
+            for request in self.requests:
+                if request[0] != key:
+                    continue
+                i = columns.index(request[1])
+                value = finish_statistic(request[2], size[order], count[order, i],
+                                         np.zeros(len(order)), m2[order, i], mean[order, i])
+                if index is None:
+                    results[request] = value[0]
+                else:
+                    results[request] = pd.Series(value, index=index, name=request[1])
+        return results
+
+
+def plain_label(label):
+    """A group label as a JSON value: tuples become lists and NumPy scalars Python ones"""
+    if isinstance(label, tuple):
+        return [plain_label(part) for part in label]
+    return label.item() if isinstance(label, np.generic) else label
+
+
+def spec_requests(key, spec):
+    """Expand a groupby-style {column: stat or [stats]} spec into aggregation requests"""
+    return [(key, column, stat) for column, stats in spec.items()
+            for stat in ([stats] if isinstance(stats, str) else stats)]
+
+
+def aggregate_frame(df, key, spec, results=None):
+    """
+    Equivalent of df.groupby(key).agg(spec) for a {column: stat or [stats]} spec.
+    Pass `results` from a shared aggregate() call to avoid another sweep.
+    """
+    requests = spec_requests(key, spec)
+    if results is None:
+        results = aggregate(df, requests)
+    if all(isinstance(stats, str) for stats in spec.values()):
+        return pd.DataFrame({column: results[(key, column, stat)] for column, stat in spec.items()})
+    return pd.DataFrame({(column, stat): results[(key, column, stat)] for _, column, stat in requests})
+
+
+class CorrelationAccumulator:
+    """
+    Mergeable sufficient statistics for a pairwise-complete Pearson matrix.
+    For every column pair (i, j) it keeps, over the rows where both are present,
+    the row count, the sum and sum of squares of column i, and the cross product.
+    Partials from chunks, partitions or cube cells simply add up.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = np.zeros((k, k))
+        self.sum = np.zeros((k, k))
+        self.sumsq = np.zeros((k, k))
+        self.cross = np.zeros((k, k))
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        """Build an accumulator over all rows of a frame"""
+        return cls(columns).update(df)
+
+    @staticmethod
+    def moments(values):
+        """Return the (n, sum, sumsq, cross) matrices of a 2-D value array"""
+        valid = ~np.isnan(values)
+        present = valid.astype('float64')
+        filled = np.where(valid, values, 0.0)
+        return (present.T @ present, filled.T @ present,
+                (filled * filled).T @ present, filled.T @ filled)
+
+    def update(self, data):
+        """Fold the rows of a DataFrame (or a 2-D array in column order) into the totals"""
+        if isinstance(data, pd.DataFrame):
+            data = data[self.columns].to_numpy(dtype='float64')
+        n, total, squares, cross = self.moments(np.asarray(data, dtype='float64'))
+        self.n += n
+        self.sum += total
+        self.sumsq += squares
+        self.cross += cross
+        return self
+
+    def merge(self, other):
+        """Add another accumulator over the same columns into this one"""
+        if other.columns != self.columns:
+            raise ValueError("Cannot merge correlation accumulators over different columns")
+        self.n += other.n
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.cross += other.cross
+        return self
+
+    def state(self):
+        """Plain (JSON-ready) form of the sums, restored by from_state()"""
+        return {'columns': self.columns, 'n': self.n.tolist(), 'sum': self.sum.tolist(),
+                'sumsq': self.sumsq.tolist(), 'cross': self.cross.tolist()}
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an accumulator from state()"""
+        accumulator = cls(state['columns'])
+        for name in ('n', 'sum', 'sumsq', 'cross'):
+            setattr(accumulator, name, np.array(state[name], dtype='float64').reshape(accumulator.n.shape))
+        return accumulator
+
+    def __add__(self, other):
+        result = CorrelationAccumulator(self.columns)
+        return result.merge(self).merge(other)
+
+    def correlation(self):
+        """Return the Pearson correlation matrix as a DataFrame, like DataFrame.corr()"""
+        n, s, q, c = self.n, self.sum, self.sumsq, self.cross
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = n * c - s * s.T
+            variance = (n * q - s * s) * (n * q - s * s).T
+            corr = np.where((n > 1) & (variance > 0), covariance / np.sqrt(variance), np.nan)
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
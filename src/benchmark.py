@@ -0,0 +1,233 @@
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import config
+from config import BENCHMARK_REPEAT, BENCHMARK_SIZES, DATASET_SCHEMA
+from cube import CorrelationCube, build_dashboard_cubes
+from data_loader import clear_dataset_cache, clear_shared_store, set_shared_store_dir, sidecar_path
+from features import with_derived_features
+from figures import clear_figure_cache
+from filter_index import FilterIndex
+from significance import clear_significance_cache
+from stress_analysis import analyze_correlations, analyze_workplace_dynamics, calculate_stress_metrics, load_data
+from synthetic import write_dataset
+from trendlines import clear_trend_cache
+
+# Sidebar filter combinations replayed by the filtering benchmark
+FILTER_CASES = [
+    ({}, None),
+    ({'Department': ['IT']}, (0, 40)),
+    ({'Department': ['IT', 'Sales'], 'Gender': ['Female']}, (5, 25)),
+    ({'Gender': ['Male', 'Other']}, (10, 12))
+]
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+
+def measure(func, repeat=BENCHMARK_REPEAT, memory=True):
+    """
+    Return (median wall time in seconds, peak traced bytes) for a callable.
+    Memory is traced in one extra run so tracing does not distort the timings.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return float(np.median(times)), peak
+
+
+def dataset_path(data_dir, rows):
+    """Return the synthetic dataset for a size, generating it on first use"""
+    path = os.path.join(data_dir, f'stress_{rows}.csv')
+    if not os.path.exists(path):
+        write_dataset(path, rows)
+    return path
+
+
+def _cold_load(path):
+    clear_shared_store()
+    if os.path.exists(sidecar_path(path)):
+        os.remove(sidecar_path(path))
+    return load_data(path)
+
+
+def _sidecar_load(path):
+    clear_shared_store()
+    return load_data(path)
+
+
+def _mapped_load(path):
+    clear_dataset_cache()
+    return load_data(path)
+
+
+def _select_all(filter_index):
+    for filters, value_range in FILTER_CASES:
+        filter_index.select(filters, value_range).frame()
+
+
+def core_steps(path):
+    """Named callables for the loader and analysis functions over one dataset"""
+    df = load_data(path)
+    featured = with_derived_features(df)
+    filter_index = FilterIndex(featured)
+    return [
+        ('load_data (csv)', lambda: _cold_load(path)),
+        ('load_data (sidecar)', lambda: _sidecar_load(path)),
+        ('load_data (shared store)', lambda: _mapped_load(path)),
+        ('load_data (cached)', lambda: load_data(path)),
+        ('derived features', lambda: with_derived_features(df)),
+        ('filter index', lambda: FilterIndex(featured)),
+        ('filter select', lambda: _select_all(filter_index)),
+        ('dashboard cubes', lambda: build_dashboard_cubes(df)),
+        ('correlation cube', lambda: CorrelationCube(df)),
+        ('calculate_stress_metrics', lambda: calculate_stress_metrics(df)),
+        ('analyze_correlations', lambda: analyze_correlations(df)),
+        ('analyze_workplace_dynamics', lambda: analyze_workplace_dynamics(df))
+    ]
+
+
+def dashboard_steps(path):
+    """
+    Named callables rerunning the dashboard headlessly with one section visible
+    and one of its tabs selected, with the per-filter-state result caches
+    cleared. The run with no sections covers the metric cards and distribution
+    charts; subtract it from the others to get a section's own cost.
+    Returns no steps, with a message, when Streamlit has no AppTest (before 1.28).
+    """
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print('Skipping the dashboard steps: they need streamlit>=1.28 for streamlit.testing')
+        return []
+    from streamlit_app import DASHBOARD_SECTIONS
+
+    # The app reads the default dataset path from config on every run
+    config.DEFAULT_DATASET_PATH = path
+    app = AppTest.from_file(APP_PATH, default_timeout=3600)
+    app.run()
+
+    def rerun(visible, tab=None):
+        # Figures, trendlines and significance tests are cached per filter state;
+        # drop them so every timed rerun builds its section from scratch
+        clear_figure_cache()
+        clear_trend_cache()
+        clear_significance_cache()
+        # Tab bars are radios keyed by name; every one starts on its first tab
+        for key, options in tabs.items():
+            app.session_state[key] = options[0]
+        if tab is not None:
+            app.session_state[tab[0]] = tab[1]
+        # Widgets are looked up again after every run; a stale handle is not applied
+        next(widget for widget in app.multiselect if widget.label == 'Visible Sections').set_value(visible)
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+    # Find each section's tab bars, which also warms up Plotly's and
+    # Streamlit's lazily built state before timing
+    tabs, section_tabs = {}, {}
+    for section in DASHBOARD_SECTIONS:
+        rerun([section])
+        section_tabs[section] = [radio.key for radio in app.radio if radio.key]
+        tabs.update({radio.key: list(radio.options) for radio in app.radio if radio.key})
+    rerun([])
+
+    steps = [('dashboard: cards and distributions', lambda: rerun([]))]
+    for section in DASHBOARD_SECTIONS:
+        if not section_tabs[section]:
+            steps.append((f'dashboard: {section}', lambda section=section: rerun([section])))
+        for key in section_tabs[section]:
+            for option in tabs[key]:
+                steps.append((f'dashboard: {section} / {option}',
+                              lambda section=section, tab=(key, option): rerun([section], tab)))
+    return steps
+
+
+def run_benchmarks(sizes, data_dir, repeat=BENCHMARK_REPEAT, memory=True, dashboard=True):
+    """
+    Time every step at every dataset size; returns a list of result records.
+    Cold loads clear the shared store, so the run uses a private one under `data_dir`.
+    """
+    results = []
+    previous_store = set_shared_store_dir(os.path.join(data_dir, 'shared_store'))
+    try:
+        for rows in sizes:
+            path = dataset_path(data_dir, rows)
+            steps = core_steps(path)
+            if dashboard:
+                steps += dashboard_steps(path)
+            for step, func in steps:
+                seconds, peak = measure(func, repeat, memory)
+                results.append({'rows': rows, 'step': step, 'seconds': seconds, 'peak_bytes': peak})
+                print(f'{rows:>10,} {step:<70} {seconds:9.4f}s'
+                      + (f' {peak / 2 ** 20:9.1f} MiB' if peak is not None else ''))
+    finally:
+        set_shared_store_dir(previous_store)
+    return results
+
+
+def environment():
+    """Describe the machine and library versions a run was made with"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'schema': list(DATASET_SCHEMA)
+    }
+
+
+def compare(results, baseline_path):
+    """Print the time ratio of every step against a previous results file"""
+    with open(baseline_path) as handle:
+        baseline = {(r['rows'], r['step']): r for r in json.load(handle)['results']}
+    print(f'\nRelative to {baseline_path} (>1 is slower):')
+    for record in results:
+        previous = baseline.get((record['rows'], record['step']))
+        if previous and previous['seconds'] > 0:
+            ratio = record['seconds'] / previous['seconds']
+            print(f"{record['rows']:>10,} {record['step']:<70} {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark loading, filtering, analysis and dashboard sections')
+    parser.add_argument('--rows', type=int, nargs='+', default=BENCHMARK_SIZES, help='dataset sizes to run')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'stress_benchmark'),
+                        help='where synthetic datasets are generated and kept between runs')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file')
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT, help='timing runs per step (the median is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced-memory run')
+    parser.add_argument('--no-dashboard', action='store_true', help='skip the dashboard section reruns')
+    parser.add_argument('--baseline', help='previous results file to compare against')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = run_benchmarks(args.rows, args.data_dir, args.repeat,
+                             memory=not args.no_memory, dashboard=not args.no_dashboard)
+    with open(args.output, 'w') as handle:
+        json.dump({'environment': environment(), 'results': results}, handle, indent=2)
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used mapping, bounded by a number of entries and,
+    optionally, by the total size of its values as measured by `sizeof`.
+    `on_evict(key, value)` is called for values that are evicted, replaced or cleared.
+    """
+
+    def __init__(self, max_entries, max_bytes=None, sizeof=sys.getsizeof, on_evict=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return a cached value and mark it as recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries over the bounds"""
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                old_value, old_size = self._entries.pop(key)
+                self.total_bytes -= old_size
+                if old_value is not value:
+                    evicted.append((key, old_value))
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes is not None and self.total_bytes > self.max_bytes)):
+                old_key, (old_value, old_size) = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append((old_key, old_value))
+        self._evicted(evicted)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            evicted = [(key, value) for key, (value, _) in self._entries.items()]
+            self._entries.clear()
+            self.total_bytes = 0
+        self._evicted(evicted)
+
+    def _evicted(self, entries):
+        if self.on_evict is not None:
+            for key, value in entries:
+                self.on_evict(key, value)
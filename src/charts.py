@@ -0,0 +1,402 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from config import (BOX_MAX_POINTS, CHART_COLORS, SCATTER_AGGREGATE_THRESHOLD, SCATTER_GRID_SIZE,
+                    SCATTER_MAX_MARKER_SIZE, VIOLIN_GRID_SIZE, VIOLIN_MAX_POINTS)
+
+# Half of the category slot a violin or box may occupy
+_HALF_WIDTH = 0.4
+
+
+def grid_codes(values, bins):
+    """
+    Map values onto a 1-D grid, returning (bin codes, bin centers).
+    Integer-valued columns with few distinct values get one bin per value.
+    """
+    lo, hi = values.min(), values.max()
+    if np.all(values == np.round(values)) and hi - lo + 1 <= bins:
+        return (values - lo).astype(np.int64), np.arange(lo, hi + 1)
+    width = (hi - lo) / bins if hi > lo else 1.0
+    codes = np.clip(((values - lo) / width).astype(np.int64), 0, bins - 1)
+    return codes, lo + (np.arange(bins) + 0.5) * width
+
+
+def bin_points(df, x, y, color=None, bins=SCATTER_GRID_SIZE):
+    """
+    Count points per 2-D grid cell (and per category when `color` is given)
+    in one bincount. Returns a frame of non-empty cells with x, y, color and count.
+    """
+    xs = df[x].to_numpy(dtype='float64')
+    ys = df[y].to_numpy(dtype='float64')
+    keep = ~(np.isnan(xs) | np.isnan(ys))
+    if color is not None:
+        categories, levels = pd.factorize(df[color])
+        keep &= categories >= 0
+    if not keep.any():
+        return pd.DataFrame(columns=[x, y] + ([color] if color else []) + ['count'])
+
+    x_codes, x_centers = grid_codes(xs[keep], bins)
+    y_codes, y_centers = grid_codes(ys[keep], bins)
+    shape = [len(x_centers), len(y_centers)]
+    codes = [x_codes, y_codes]
+    if color is not None:
+        shape.insert(0, len(levels))
+        codes.insert(0, categories[keep])
+
+    counts = np.bincount(np.ravel_multi_index(codes, shape), minlength=int(np.prod(shape)))
+    cells = np.flatnonzero(counts)
+    coords = np.unravel_index(cells, shape)
+    binned = {x: x_centers[coords[-2]], y: y_centers[coords[-1]], 'count': counts[cells]}
+    if color is not None:
+        binned[color] = np.asarray(levels)[coords[0]]
+    return pd.DataFrame(binned)
+
+
+def density_scatter(df, x, y, color=None, bins=SCATTER_GRID_SIZE,
+                    color_discrete_sequence=CHART_COLORS, title=""):
+    """
+    Scatter drawn from server-side bin counts: a count heatmap without `color`,
+    otherwise one layer of count-sized markers per category.
+    """
+    binned = bin_points(df, x, y, color, bins)
+    fig = go.Figure()
+    if color is None:
+        if len(binned):
+            grid = binned.pivot(index=y, columns=x, values='count')
+            fig.add_trace(go.Heatmap(z=grid.values, x=grid.columns, y=grid.index,
+                                     colorscale='Blues', colorbar={'title': 'Count'},
+                                     hovertemplate=f'{x}=%{{x}}<br>{y}=%{{y}}<br>count=%{{z}}<extra></extra>'))
+    else:
+        peak = binned['count'].max() if len(binned) else 1
+        for i, (category, layer) in enumerate(binned.groupby(color, sort=False)):
+            sizes = np.maximum(np.sqrt(layer['count'] / peak) * SCATTER_MAX_MARKER_SIZE, 2)
+            fig.add_trace(go.Scatter(
+                x=layer[x], y=layer[y], mode='markers', name=str(category),
+                marker={'size': sizes, 'color': color_discrete_sequence[i % len(color_discrete_sequence)],
+                        'opacity': 0.6},
+                customdata=layer['count'],
+                hovertemplate=f'{x}=%{{x}}<br>{y}=%{{y}}<br>count=%{{customdata}}<extra>{category}</extra>'
+            ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=color or '')
+    return fig
+
+
+def scatter_figure(df, x, y, color=None, threshold=SCATTER_AGGREGATE_THRESHOLD, **kwargs):
+    """
+    px.scatter for small frames; above `threshold` rows, a density_scatter so the
+    browser receives one point per occupied grid cell instead of every row.
+    """
+    if len(df) <= threshold:
+        if color is not None and isinstance(df[color].dtype, pd.CategoricalDtype):
+            # px looks up a group for every category, so empty ones would raise
+            df = df.assign(**{color: df[color].cat.remove_unused_categories()})
+        return px.scatter(df, x=x, y=y, color=color, **kwargs)
+    return density_scatter(df, x, y, color,
+                           color_discrete_sequence=kwargs.get('color_discrete_sequence', CHART_COLORS),
+                           title=kwargs.get('title', ""))
+
+
+def histogram_counts(values, nbins):
+    """
+    Count values into about `nbins` equal-width bins in one pass, returning
+    (bin centers, counts). Integer-valued columns get whole-number bins, one per
+    value when they fit, so no bin straddles a value.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return np.array([]), np.array([], dtype=np.int64)
+    lo, hi = values.min(), values.max()
+    if np.all(values == np.round(values)):
+        width = max(1.0, np.ceil((hi - lo + 1) / nbins))
+        codes = ((values - lo) // width).astype(np.int64)
+        centers = lo + (width - 1) / 2 + width * np.arange(codes.max() + 1)
+    else:
+        codes, centers = grid_codes(values, nbins)
+    return centers, np.bincount(codes, minlength=len(centers))
+
+
+def histogram_figure(df, x, nbins, color_discrete_sequence=CHART_COLORS, opacity=None, title=""):
+    """
+    Histogram drawn as bars from server-side bin counts, so the browser
+    receives one value per bin instead of every row.
+    """
+    centers, counts = histogram_counts(df[x], nbins)
+    fig = go.Figure(go.Bar(
+        x=centers, y=counts, marker_color=color_discrete_sequence[0], opacity=opacity,
+        hovertemplate=f'{x}=%{{x}}<br>count=%{{y}}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title='count', bargap=0)
+    return fig
+
+
+def category_counts(values):
+    """
+    Rows per category, largest first, like value_counts: a bincount of the
+    category codes for categoricals (empty categories included), else of
+    factorized codes.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, labels = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, labels = pd.factorize(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+    counts = pd.Series(counts, index=pd.Index(labels, name=values.name), name='count')
+    return counts.sort_values(ascending=False, kind='stable')
+
+
+def _sort_groups(codes, n_groups, values):
+    """Sort values by (group code, value), dropping missing ones. Returns (sorted values, group start offsets)"""
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    order = np.lexsort((values, codes))
+    starts = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    return values[order], starts
+
+
+def group_values(df, x, y):
+    """
+    Sort a value column by (group, value) once. Groups follow order of appearance
+    like Plotly Express. Returns (group labels, sorted values, group start offsets).
+    """
+    codes, labels = pd.factorize(df[x])
+    sorted_values, starts = _sort_groups(codes, len(labels), df[y].to_numpy(dtype='float64'))
+    return np.asarray(labels), sorted_values, starts
+
+
+def column_values(df, columns):
+    """Like group_values, with one group per column instead of a melted frame"""
+    arrays = []
+    for column in columns:
+        values = df[column].to_numpy(dtype='float64')
+        arrays.append(np.sort(values[~np.isnan(values)]))
+    starts = np.concatenate([[0], np.cumsum([len(values) for values in arrays])]).astype(np.int64)
+    return np.asarray(columns, dtype=object), np.concatenate(arrays), starts
+
+
+def group_quantiles(sorted_values, starts, qs):
+    """Linear-interpolated quantiles of every group at once, shape (groups, len(qs))"""
+    counts = np.diff(starts)
+    position = starts[:-1, None] + np.asarray(qs)[None, :] * np.maximum(counts - 1, 0)[:, None]
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts[1:, None] - 1)
+    fraction = position - lower
+    if not len(sorted_values):
+        return np.full(position.shape, np.nan)
+    result = sorted_values[lower] * (1 - fraction) + sorted_values[np.maximum(upper, lower)] * fraction
+    return np.where(counts[:, None] > 0, result, np.nan)
+
+
+def box_statistics(sorted_values, starts):
+    """Quartiles and Tukey fences (clipped to the data) per group"""
+    q1, median, q3 = group_quantiles(sorted_values, starts, [0.25, 0.5, 0.75]).T
+    iqr = q3 - q1
+    lower_fence, upper_fence = np.full(len(q1), np.nan), np.full(len(q1), np.nan)
+    for i in range(len(q1)):
+        segment = sorted_values[starts[i]:starts[i + 1]]
+        if len(segment):
+            lower_fence[i] = segment[np.searchsorted(segment, q1[i] - 1.5 * iqr[i], side='left')]
+            upper_fence[i] = segment[np.searchsorted(segment, q3[i] + 1.5 * iqr[i], side='right') - 1]
+    return {'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': lower_fence, 'upperfence': upper_fence}
+
+
+def group_densities(sorted_values, starts, stats, grid_size=VIOLIN_GRID_SIZE):
+    """
+    Gaussian KDE per group on a shared grid: one 2-D bincount bins every group,
+    then each group's histogram is smoothed with its own Silverman bandwidth.
+    Densities outside a group's data range +/- 2 bandwidths are cut, like
+    Plotly's default 'soft' span. `stats` are the groups' box_statistics.
+    Returns (grid, densities of shape (groups, grid)).
+    """
+    counts = np.diff(starts)
+    n_groups = len(counts)
+    if not counts.any():
+        # No values to place a grid around (e.g. filters selecting no rows)
+        return np.linspace(0.0, 1.0, grid_size), np.zeros((n_groups, grid_size))
+    with np.errstate(invalid='ignore'):
+        std = np.array([sorted_values[starts[i]:starts[i + 1]].std(ddof=1) if counts[i] > 1 else 0.0
+                        for i in range(n_groups)])
+        spread = np.fmin(std, (stats['q3'] - stats['q1']) / 1.349)
+        spread = np.where(spread > 0, spread, std)
+        bandwidth = 1.059 * spread * np.maximum(counts, 1) ** -0.2
+
+    lows = np.array([sorted_values[starts[i]] if counts[i] else np.nan for i in range(n_groups)])
+    highs = np.array([sorted_values[starts[i + 1] - 1] if counts[i] else np.nan for i in range(n_groups)])
+    pad = np.nan_to_num(2 * np.nanmax(bandwidth))
+    grid = np.linspace(np.nanmin(lows) - pad, np.nanmax(highs) + pad, grid_size)
+    step = grid[1] - grid[0] if grid[-1] > grid[0] else 1.0
+
+    groups = np.repeat(np.arange(n_groups), counts)
+    bins = np.clip(np.rint((sorted_values - grid[0]) / step).astype(np.int64), 0, grid_size - 1)
+    histogram = np.bincount(groups * grid_size + bins,
+                            minlength=n_groups * grid_size).reshape(n_groups, grid_size)
+
+    densities = np.zeros((n_groups, grid_size))
+    offsets = np.arange(-grid_size + 1, grid_size) * step
+    for i in range(n_groups):
+        if not counts[i]:
+            continue
+        if bandwidth[i] > 0:
+            kernel = np.exp(-0.5 * (offsets / bandwidth[i]) ** 2)
+            density = np.convolve(histogram[i], kernel)[grid_size - 1:2 * grid_size - 1]
+            density /= counts[i] * bandwidth[i] * np.sqrt(2 * np.pi)
+        else:
+            density = histogram[i] / (counts[i] * step)
+        span = (grid >= lows[i] - 2 * bandwidth[i]) & (grid <= highs[i] + 2 * bandwidth[i])
+        densities[i] = np.where(span, density, 0.0)
+    return grid, densities
+
+
+def sample_group_points(sorted_values, starts, max_points, seed=0):
+    """Pick at most `max_points` values per group, uniformly at random"""
+    rng = np.random.default_rng(seed)
+    samples = []
+    for i in range(len(starts) - 1):
+        count = starts[i + 1] - starts[i]
+        picks = rng.choice(count, size=min(count, max_points), replace=False) if count else []
+        samples.append(sorted_values[starts[i] + np.asarray(picks, dtype=np.int64)])
+    return samples
+
+
+def group_outliers(sorted_values, starts, stats, max_points):
+    """
+    Values outside each group's fences. Groups with more than `max_points`
+    outliers keep that many, evenly spaced so the extremes are always drawn.
+    """
+    outliers = []
+    for i in range(len(starts) - 1):
+        segment = sorted_values[starts[i]:starts[i + 1]]
+        values = segment[(segment < stats['lowerfence'][i]) | (segment > stats['upperfence'][i])]
+        if len(values) > max_points:
+            values = values[np.linspace(0, len(values) - 1, max_points).round().astype(np.int64)]
+        outliers.append(values)
+    return outliers
+
+
+def box_figure(df, x, y, color=None, points='outliers', max_points=BOX_MAX_POINTS,
+               value_name='Value', color_discrete_sequence=CHART_COLORS, title=""):
+    """
+    Box plot per `x` group, or per (`color`, `x`) pair side by side, drawn from
+    server-side quartiles and fences. `points` is 'outliers', 'all' (a uniform
+    sample) or False, with at most `max_points` per box, so the payload depends
+    on the number of boxes, not the number of rows. `y` may also be a list of
+    columns, giving one box per column labelled `x` and `value_name`.
+    """
+    if isinstance(y, list):
+        labels, sorted_values, starts = column_values(df, y)
+        series = [(label, [(i, i)]) for i, label in enumerate(labels)]
+        ticks, slot = labels, 2 * _HALF_WIDTH
+        y_title = value_name
+    elif color is None or color == x:
+        labels, sorted_values, starts = group_values(df, x, y)
+        series = [(label, [(i, i)]) for i, label in enumerate(labels)]
+        ticks, slot = labels, 2 * _HALF_WIDTH
+        y_title = y
+    else:
+        x_codes, ticks = pd.factorize(df[x])
+        color_codes, labels = pd.factorize(df[color])
+        codes = np.where((x_codes >= 0) & (color_codes >= 0), color_codes * len(ticks) + x_codes, -1)
+        sorted_values, starts = _sort_groups(codes, len(labels) * len(ticks), df[y].to_numpy(dtype='float64'))
+        counts = np.diff(starts)
+        slot = 2 * _HALF_WIDTH / max(len(labels), 1)
+        series = []
+        for c, label in enumerate(labels):
+            offset = -_HALF_WIDTH + slot * (c + 0.5)
+            series.append((label, [(i + offset, c * len(ticks) + i) for i in range(len(ticks))
+                                   if counts[c * len(ticks) + i]]))
+        y_title = y
+
+    stats = box_statistics(sorted_values, starts)
+    if points == 'all':
+        shown = sample_group_points(sorted_values, starts, max_points)
+    elif points == 'outliers':
+        shown = group_outliers(sorted_values, starts, stats, max_points)
+    else:
+        shown = None
+
+    width = slot * 0.75
+    fig = go.Figure()
+    for j, (label, boxes) in enumerate(series):
+        color_value = color_discrete_sequence[j % len(color_discrete_sequence)]
+        positions = [position for position, _ in boxes]
+        groups = [group for _, group in boxes]
+        fig.add_trace(go.Box(
+            x=positions, q1=stats['q1'][groups], median=stats['median'][groups], q3=stats['q3'][groups],
+            lowerfence=stats['lowerfence'][groups], upperfence=stats['upperfence'][groups],
+            width=width, marker_color=color_value, boxpoints=False,
+            name=str(label), legendgroup=str(label)
+        ))
+        if shown is not None:
+            point_x = [np.full(len(shown[group]), position) for position, group in boxes]
+            point_y = [shown[group] for _, group in boxes]
+            if not sum(len(values) for values in point_y):
+                continue
+            point_x = np.concatenate(point_x)
+            if points == 'all':
+                point_x = point_x + np.random.default_rng(j).uniform(-width / 3, width / 3, len(point_x))
+            fig.add_trace(go.Scatter(
+                x=point_x, y=np.concatenate(point_y), mode='markers',
+                marker={'color': color_value, 'size': 3, 'opacity': 0.5},
+                name=str(label), legendgroup=str(label), showlegend=False
+            ))
+    fig.update_layout(
+        title=title,
+        boxmode='overlay',
+        xaxis={'tickmode': 'array', 'tickvals': list(range(len(ticks))),
+               'ticktext': [str(tick) for tick in ticks], 'title': x},
+        yaxis_title=y_title,
+        legend_title_text=color or x
+    )
+    return fig
+
+
+def violin_figure(df, x, y, box=True, points=False, max_points=VIOLIN_MAX_POINTS,
+                  color_discrete_sequence=CHART_COLORS, title=""):
+    """
+    Violin plot per `x` group drawn from server-side summaries: a KDE outline,
+    precomputed box statistics and at most `max_points` sampled points per group.
+    The payload depends on the number of groups, not the number of rows.
+    """
+    labels, sorted_values, starts = group_values(df, x, y)
+    stats = box_statistics(sorted_values, starts)
+    grid, densities = group_densities(sorted_values, starts, stats)
+    samples = sample_group_points(sorted_values, starts, max_points) if points else None
+
+    fig = go.Figure()
+    for i, label in enumerate(labels):
+        color = color_discrete_sequence[i % len(color_discrete_sequence)]
+        peak = densities[i].max()
+        if peak > 0:
+            inside = densities[i] > 0
+            half = densities[i][inside] / peak * _HALF_WIDTH
+            outline_y = grid[inside]
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([i - half, (i + half)[::-1]]),
+                y=np.concatenate([outline_y, outline_y[::-1]]),
+                fill='toself', mode='lines', line={'color': color, 'width': 1},
+                opacity=0.6, name=str(label), legendgroup=str(label), hoverinfo='skip'
+            ))
+        if box:
+            fig.add_trace(go.Box(
+                x=[i], q1=[stats['q1'][i]], median=[stats['median'][i]], q3=[stats['q3'][i]],
+                lowerfence=[stats['lowerfence'][i]], upperfence=[stats['upperfence'][i]],
+                width=_HALF_WIDTH / 4, marker_color=color, fillcolor='white',
+                name=str(label), legendgroup=str(label), showlegend=False
+            ))
+        if samples is not None and len(samples[i]):
+            jitter = np.random.default_rng(i).uniform(-_HALF_WIDTH / 2, _HALF_WIDTH / 2, len(samples[i]))
+            fig.add_trace(go.Scatter(
+                x=i + jitter, y=samples[i], mode='markers',
+                marker={'color': color, 'size': 3, 'opacity': 0.5},
+                name=str(label), legendgroup=str(label), showlegend=False
+            ))
+    fig.update_layout(
+        title=title,
+        xaxis={'tickmode': 'array', 'tickvals': list(range(len(labels))),
+               'ticktext': [str(label) for label in labels], 'title': x},
+        yaxis_title=y
+    )
+    return fig
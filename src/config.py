@@ -1,9 +1,11 @@
 import os
+import tempfile
 
-# Default dataset path
-DEFAULT_DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
-                                  'data', 
-                                  'corporate_stress_dataset.csv')
+# Default dataset path, overridable through the STRESS_DATASET_PATH environment variable
+DEFAULT_DATASET_PATH = os.environ.get('STRESS_DATASET_PATH',
+                                      os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                   'data',
+                                                   'corporate_stress_dataset.csv'))
 
 # Visualization settings
 CHART_COLORS = [
@@ -26,4 +28,126 @@ CHART_THEME = {
     'axis_font_size': 12,
     'axis_font_color': '#475569',
     'grid_color': '#f8fafc'
-} 
\ No newline at end of file
+} 
+
+# Dataset schema: only these columns are read, parsed straight into these dtypes
+DATASET_SCHEMA = {
+    'Age': 'int64',
+    'Gender': 'object',
+    'Job_Role': 'object',
+    'Experience_Years': 'int64',
+    'Monthly_Salary_INR': 'float64',
+    'Working_Hours_per_Week': 'int64',
+    'Remote_Work': 'object',
+    'Stress_Level': 'int64',
+    'Department': 'object',
+    'Sleep_Hours': 'float64',
+    'Work_Life_Balance': 'int64'
+}
+
+# Numeric columns used for correlation analysis
+NUMERIC_COLUMNS = ['Stress_Level', 'Age', 'Working_Hours_per_Week',
+                   'Monthly_Salary_INR', 'Sleep_Hours', 'Work_Life_Balance']
+
+# Number of parsed datasets kept in memory by the loader
+DATASET_CACHE_SIZE = 4
+
+# Columnar (Arrow IPC) sidecar written next to a CSV on first read
+USE_COLUMNAR_SIDECAR = True
+SIDECAR_SUFFIX = '.arrow'
+
+# Shared dataset store: loaded datasets are written once as Arrow IPC files named by
+# content hash and memory-mapped by every process, so sessions and server processes
+# share the same physical pages instead of holding one parsed copy each
+USE_SHARED_STORE = True
+SHARED_STORE_DIR = os.environ.get('STRESS_SHARED_STORE',
+                                  os.path.join(tempfile.gettempdir(), 'stress_shared_store'))
+# Store files unused for this many seconds are deleted, and the least recently used
+# ones while the store is larger than SHARED_STORE_MAX_BYTES
+SHARED_STORE_MAX_AGE = 7 * 24 * 3600
+SHARED_STORE_MAX_BYTES = 8 * 2 ** 30
+
+# Derived categorical columns: (source column, bin edges, labels)
+DERIVED_BINS = {
+    'Sleep_Category': ('Sleep_Hours', [0, 6, 7, 8, 12], ['< 6 hours', '6-7 hours', '7-8 hours', '> 8 hours']),
+    'Sleep_Quality': ('Sleep_Hours', [0, 5, 6, 7, 8, 12], ['Very Poor', 'Poor', 'Fair', 'Good', 'Excellent']),
+    'Burnout_Risk': ('Stress_Level', [0, 3, 6, 8, 10], ['Low', 'Moderate', 'High', 'Severe']),
+    'Age_Group': ('Age', [20, 30, 40, 50, 60], ['20-30', '31-40', '41-50', '51-60'])
+}
+
+# Scatter plots above this many rows are binned server-side into a density grid
+SCATTER_AGGREGATE_THRESHOLD = 20000
+SCATTER_GRID_SIZE = 60
+SCATTER_MAX_MARKER_SIZE = 24
+
+# Violin plots: density grid resolution and cap on overlaid points per group
+VIOLIN_GRID_SIZE = 200
+VIOLIN_MAX_POINTS = 300
+
+# Box plots: cap on outliers (or sampled points, when all points are shown) drawn per box
+BOX_MAX_POINTS = 300
+
+# LOWESS trendlines: smoothing span, x bins per group and cached results
+LOWESS_FRAC = 2 / 3
+LOWESS_BINS = 100
+TRENDLINE_CACHE_SIZE = 64
+
+# Streaming batch report: rows per CSV chunk and size of the hours/stress scatter sample
+STREAM_CHUNK_SIZE = 100000
+HOURS_SAMPLE_SIZE = 1000
+
+# Incremental batch report: the report aggregates of a CSV are kept in a state file next
+# to it and only rows appended since the last run are folded in. New rows are found by
+# byte offset, by row count or by a key column that increases with every appended row
+APPEND_STATE_SUFFIX = '.report-state.json'
+APPEND_MODE = 'offset'
+APPEND_KEY_COLUMN = 'ID'
+
+# Dashboard uploads: size and row limits, checked before and while parsing in chunks
+# (Streamlit's own server.maxUploadSize in .streamlit/config.toml must allow the size)
+UPLOAD_MAX_BYTES = 1024 * 2 ** 20
+UPLOAD_MAX_ROWS = 20000000
+
+# Batch report plots: output directory, file formats and resolution
+REPORT_OUTPUT_DIR = 'outputs'
+REPORT_FORMATS = ['png']
+REPORT_DPI = 100
+
+# Activity level: quantile bins of a column, as (source column, quantiles, labels).
+# 'global' uses the whole dataset's quantiles; 'filter' recomputes them for each filtered view
+ACTIVITY_LEVELS = ('Working_Hours_per_Week', 4, ['Low', 'Moderate', 'High', 'Very High'])
+ACTIVITY_LEVEL_SCOPE = 'global'
+
+# Memory compaction of loaded datasets: text columns with at most this share of distinct
+# values become categoricals, integers are downcast, and floats become float32 when that
+# keeps every value at the decimal resolution it was recorded with (up to FLOAT32_MAX_DECIMALS)
+COMPACT_DATASETS = True
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+FLOAT32_MAX_DECIMALS = 4
+
+# Benchmark suite: dataset sizes (rows) and timing repeats per step
+BENCHMARK_SIZES = [10000, 100000, 1000000, 10000000]
+BENCHMARK_REPEAT = 3
+
+# Dashboard section timings are appended to this JSON lines file when set
+PERFORMANCE_LOG_PATH = os.environ.get('STRESS_PERFORMANCE_LOG')
+
+# Dashboard figure cache: serialized Plotly JSON per (dataset, filter state, chart),
+# bounded by entry count and total JSON size
+FIGURE_CACHE_SIZE = 256
+FIGURE_CACHE_BYTES = 64 * 2 ** 20
+
+# Significance tests of dashboard group comparisons: bootstrap resamples, confidence level
+# and seed, values drawn per resampling batch, most distinct values resampled through
+# per-group value counts, and cached results per (filter state, comparison)
+SIGNIFICANCE_RESAMPLES = 2000
+SIGNIFICANCE_CONFIDENCE = 0.95
+SIGNIFICANCE_SEED = 0
+BOOTSTRAP_BATCH_ELEMENTS = 2 ** 22
+BOOTSTRAP_MAX_DISTINCT = 4096
+SIGNIFICANCE_CACHE_SIZE = 128
+
+# Local metrics service: listening address and number of cached responses
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_CACHE_SIZE = 1024
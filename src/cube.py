@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import CorrelationAccumulator, dimension_codes, finish_statistic
+from config import NUMERIC_COLUMNS
+
+# Sidebar filter dimensions every dashboard cuboid is keyed by
+FILTER_DIMENSIONS = ['Department', 'Gender', 'Experience_Years']
+
+# Chart dimensions, each stored in its own cuboid next to the filter dimensions
+CHART_DIMENSIONS = ['Working_Hours_per_Week', 'Remote_Work', 'Work_Life_Balance',
+                    'Sleep_Category', 'Sleep_Quality', 'Age_Group']
+
+CUBE_METRICS = ['Stress_Level', 'Working_Hours_per_Week', 'Monthly_Salary_INR', 'Work_Life_Balance']
+
+# Largest cell space aggregated with dense bincounts instead of a sort
+_DENSE_CELL_LIMIT = 1 << 22
+
+
+def weighted_median(values, counts):
+    """Median of values repeated `counts` times, averaging the middle pair like pandas"""
+    total = counts.sum()
+    if total == 0:
+        return np.nan
+    cumulative = np.cumsum(counts)
+    lower = values[np.searchsorted(cumulative, (total - 1) // 2, side='right')]
+    upper = values[np.searchsorted(cumulative, total // 2, side='right')]
+    return (lower + upper) / 2
+
+
+class CellGrid:
+    """
+    Observed combinations (cells) of a set of dimensions over one dataset.
+    Missing dimension values get their own cell so rollups over other dimensions
+    still see those rows. Subclasses attach per-cell statistics.
+    """
+
+    def __init__(self, df, dimensions):
+        self.dimensions = list(dimensions)
+        self.levels = {}
+        codes = []
+        for dim in self.dimensions:
+            dim_codes, levels = dimension_codes(df, dim)
+            self.levels[dim] = levels
+            codes.append(np.where(dim_codes < 0, len(levels), dim_codes))
+        shape = tuple(len(self.levels[dim]) + 1 for dim in self.dimensions)
+        combined = np.ravel_multi_index(codes, shape)
+
+        if np.prod(shape) <= _DENSE_CELL_LIMIT:
+            dense_size = np.bincount(combined, minlength=int(np.prod(shape)))
+            cells = np.flatnonzero(dense_size)
+            cell_of_code = np.zeros(len(dense_size), dtype=np.int64)
+            cell_of_code[cells] = np.arange(len(cells))
+            self.row_cells = cell_of_code[combined]
+        else:
+            cells, self.row_cells = np.unique(combined, return_inverse=True)
+        self.size = np.bincount(self.row_cells, minlength=len(cells))
+        self.coords = dict(zip(self.dimensions, np.unravel_index(cells, shape)))
+
+    def reduce_rows(self, weights):
+        """Sum a per-row array into cells"""
+        return np.bincount(self.row_cells, weights=weights, minlength=len(self.size))
+
+    def __len__(self):
+        return len(self.size)
+
+    def cell_mask(self, filters=None, ranges=None):
+        """
+        Select the cells matching categorical filters ({dim: values}, empty means all)
+        and inclusive numeric ranges ({dim: (low, high)}).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for dim, values in (filters or {}).items():
+            if values is None or len(values) == 0:
+                continue
+            accepted = np.append(np.isin(self.levels[dim], list(values)), False)
+            mask &= accepted[self.coords[dim]]
+        for dim, (low, high) in (ranges or {}).items():
+            levels = self.levels[dim].astype('float64')
+            accepted = np.append((levels >= low) & (levels <= high), False)
+            mask &= accepted[self.coords[dim]]
+        return mask
+
+
+class StatsCube(CellGrid):
+    """
+    Count, sum and sum of squares per metric for every observed combination of
+    the cube dimensions. Group-bys over any subset of the dimensions, restricted
+    by filters on the others, are answered by rolling up cells instead of rows.
+    """
+
+    def __init__(self, df, dimensions, metrics=CUBE_METRICS):
+        super().__init__(df, dimensions)
+        self.metrics = list(metrics)
+
+        # Sums are taken around the global mean to keep variances well conditioned
+        self.shift, self.count, self.sum, self.sumsq = {}, {}, {}, {}
+        for metric in self.metrics:
+            values = df[metric].to_numpy(dtype='float64')
+            valid = ~np.isnan(values)
+            self.shift[metric] = values[valid].mean() if valid.any() else 0.0
+            centered = np.where(valid, values - self.shift[metric], 0.0)
+            self.count[metric] = self.reduce_rows(valid.astype('float64'))
+            self.sum[metric] = self.reduce_rows(centered)
+            self.sumsq[metric] = self.reduce_rows(centered * centered)
+        # Per-row cell ids are only needed while building
+        del self.row_cells
+
+    def _groups(self, by, mask):
+        """Map the selected cells onto the groups of `by`, like a sorted groupby"""
+        for dim in by:
+            mask = mask & (self.coords[dim] < len(self.levels[dim]))
+        cells = np.flatnonzero(mask)
+        if not by:
+            return cells, np.zeros(len(cells), dtype=np.int64), pd.RangeIndex(1 if len(cells) else 0)
+        shape = tuple(len(self.levels[dim]) for dim in by)
+        keys = np.ravel_multi_index([self.coords[dim][cells] for dim in by], shape)
+        groups, inverse = np.unique(keys, return_inverse=True)
+        group_codes = np.unravel_index(groups, shape)
+        arrays = [self.levels[dim][codes] for dim, codes in zip(by, group_codes)]
+        if len(by) == 1:
+            index = pd.Index(arrays[0], name=by[0])
+        else:
+            index = pd.MultiIndex.from_arrays(arrays, names=by)
+        return cells, inverse, index
+
+    def _statistic(self, metric, stat, cells, inverse, n_groups):
+        """Roll the selected cells of one metric up into a single statistic"""
+        reduce = lambda values: np.bincount(inverse, weights=values[cells], minlength=n_groups)
+        if stat == 'size':
+            return finish_statistic(stat, reduce(self.size), None, None, None, None)
+        return finish_statistic(stat, None, reduce(self.count[metric]), reduce(self.sum[metric]),
+                                reduce(self.sumsq[metric]), self.shift[metric])
+
+    def rollup(self, by, metric, stat='mean', filters=None, ranges=None):
+        """
+        Equivalent of df[filters].groupby(by)[metric].agg(stat) answered from cells.
+        `metric` and `stat` may each be a name or a list, mirroring pandas' result shape.
+        """
+        cells, inverse, index = self._groups(list(by), self.cell_mask(filters, ranges))
+        metrics = [metric] if isinstance(metric, str) else list(metric)
+        stats = [stat] if isinstance(stat, str) else list(stat)
+        columns = {
+            (m, s): self._statistic(m, s, cells, inverse, len(index))
+            for m in metrics for s in stats
+        }
+        if isinstance(metric, str) and isinstance(stat, str):
+            return pd.Series(columns[(metric, stat)], index=index, name=metric)
+        if isinstance(stat, str):
+            return pd.DataFrame({m: columns[(m, stat)] for m in metrics}, index=index)
+        if isinstance(metric, str):
+            return pd.DataFrame({s: columns[(metric, s)] for s in stats}, index=index)
+        return pd.DataFrame(columns, index=index)
+
+    def median(self, dim, filters=None, ranges=None):
+        """Median of a numeric dimension over the selected rows"""
+        cells = np.flatnonzero(self.cell_mask(filters, ranges))
+        levels = self.levels[dim].astype('float64')
+        codes = self.coords[dim][cells]
+        counts = np.bincount(codes, weights=self.size[cells], minlength=len(levels) + 1)
+        return weighted_median(levels, counts[:len(levels)])
+
+    def split_rollup(self, by, metric, dim, threshold, flag, filters=None, ranges=None):
+        """
+        Group by `by` plus a boolean `flag` column that is True where dim > threshold,
+        returned like groupby(by + [flag])[metric].mean().reset_index().
+        """
+        ranges = dict(ranges or {})
+        parts = []
+        for above, bounds in [(False, (-np.inf, threshold)),
+                              (True, (np.nextafter(threshold, np.inf), np.inf))]:
+            part = self.rollup(by, metric, filters=filters, ranges={**ranges, dim: bounds})
+            parts.append(part.reset_index().assign(**{flag: above}))
+        result = pd.concat(parts, ignore_index=True)
+        return result.sort_values(list(by) + [flag], kind='stable').reset_index(drop=True)[list(by) + [flag, metric]]
+
+
+class CorrelationCube(CellGrid):
+    """Correlation accumulator partials per cell; any filtered matrix is a sum of cells"""
+
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS, columns=NUMERIC_COLUMNS):
+        super().__init__(df, dimensions)
+        self.columns = list(columns)
+        values = df[self.columns].to_numpy(dtype='float64')
+        order = np.argsort(self.row_cells, kind='stable')
+        bounds = np.searchsorted(self.row_cells[order], np.arange(len(self) + 1))
+        del self.row_cells
+
+        k = len(self.columns)
+        self.partials = np.zeros((4, len(self), k, k))
+        for cell in range(len(self)):
+            block = values[order[bounds[cell]:bounds[cell + 1]]]
+            self.partials[:, cell] = CorrelationAccumulator.moments(block)
+
+    def accumulator(self, filters=None, ranges=None):
+        """Merge the partials of the cells selected by the filters"""
+        totals = self.partials[:, self.cell_mask(filters, ranges)].sum(axis=1)
+        result = CorrelationAccumulator(self.columns)
+        result.n, result.sum, result.sumsq, result.cross = totals
+        return result
+
+
+def build_dashboard_cubes(df):
+    """Build the base filter cuboid and one cuboid per chart dimension"""
+    cubes = {None: StatsCube(df, FILTER_DIMENSIONS)}
+    for dim in CHART_DIMENSIONS:
+        cubes[dim] = StatsCube(df, FILTER_DIMENSIONS + [dim])
+    return cubes
@@ -0,0 +1,509 @@
+import glob
+import hashlib
+import io
+import os
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+from config import (CATEGORY_MAX_UNIQUE_RATIO, COMPACT_DATASETS, DATASET_SCHEMA, DATASET_CACHE_SIZE,
+                    FLOAT32_MAX_DECIMALS, SHARED_STORE_DIR, SHARED_STORE_MAX_AGE, SHARED_STORE_MAX_BYTES,
+                    SIDECAR_SUFFIX, USE_COLUMNAR_SIDECAR, USE_SHARED_STORE)
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    # Without pyarrow every load parses the CSV
+    pa = None
+
+# Parsed datasets keyed by (content hash, columns)
+_dataset_cache = LRUCache(DATASET_CACHE_SIZE)
+_cache_lock = threading.Lock()
+
+# Content hash each loaded frame was parsed from, keyed by id(df)
+_frame_fingerprints = {}
+
+# Content hashes of files on disk, keyed by path and invalidated by size/mtime
+_file_hashes = {}
+
+# Structures derived from a loaded dataset, keyed by (id(df), name)
+_derived_cache = {}
+
+# Memory-mapped shared store files as (map, table), keyed by store path. Evicted maps
+# are closed; frames already built from them keep the mapped pages until released
+_shared_maps = LRUCache(DATASET_CACHE_SIZE, on_evict=lambda path, mapped: mapped[0].close())
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_stream(stream):
+    """Hash a binary stream in fixed-size blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: stream.read(_HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_signature(filepath):
+    """Return the (size, mtime) pair used to detect changed files cheaply"""
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def file_fingerprint(filepath):
+    """Return the content hash of a file, rehashing only when size or mtime change"""
+    signature = _file_signature(filepath)
+    cached = _file_hashes.get(filepath)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    # A sidecar written for this exact file already records its hash
+    metadata = _read_sidecar_metadata(filepath)
+    if metadata is not None and metadata['signature'] == signature:
+        digest = metadata['source_hash']
+    else:
+        with open(filepath, 'rb') as handle:
+            digest = hash_stream(handle)
+    _file_hashes[filepath] = (signature, digest)
+    return digest
+
+
+def source_fingerprint(source):
+    """Return the content hash of a file path or an uploaded file object"""
+    if isinstance(source, (str, os.PathLike)):
+        return file_fingerprint(os.fspath(source))
+    if hasattr(source, 'getvalue'):
+        return hashlib.blake2b(source.getvalue(), digest_size=16).hexdigest()
+    position = source.tell()
+    digest = hash_stream(source)
+    source.seek(position)
+    return digest
+
+
+def expand_sources(source):
+    """
+    Resolve a dataset source into a sorted list of CSV paths: a single file,
+    every *.csv file in a directory, or the files matching a glob pattern.
+    """
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.csv'))
+    elif glob.has_magic(source):
+        paths = [path for path in glob.glob(source) if os.path.isfile(path)]
+    else:
+        return [source]
+    if not paths:
+        raise FileNotFoundError(f"No dataset files found for {source}")
+    return sorted(paths)
+
+
+def _open_source(source):
+    """Return something pandas can read from, rewound to the start"""
+    if isinstance(source, (str, os.PathLike)):
+        return source
+    if hasattr(source, 'getvalue'):
+        return io.BytesIO(source.getvalue())
+    source.seek(0)
+    return source
+
+
+def parse_csv(source, columns=None):
+    """
+    Parse a CSV into the schema dtypes, reading only the requested schema columns.
+    Numeric columns holding malformed values are coerced to NaN instead of failing.
+    """
+    columns = list(columns or DATASET_SCHEMA)
+    dtypes = {col: DATASET_SCHEMA[col] for col in columns}
+    try:
+        return pd.read_csv(_open_source(source), usecols=columns, dtype=dtypes)
+    except ValueError:
+        # Dirty numeric values: parse numbers leniently and coerce afterwards
+        df = pd.read_csv(_open_source(source), usecols=columns, dtype=text_dtypes(dtypes))
+        return coerce_numeric(df, dtypes)
+
+
+def text_dtypes(dtypes):
+    """Return the text columns of a dtype mapping"""
+    return {col: dtype for col, dtype in dtypes.items() if dtype == 'object'}
+
+
+def coerce_numeric(df, dtypes):
+    """Coerce leniently parsed numeric columns, keeping the schema dtype when no value was lost"""
+    for col, dtype in dtypes.items():
+        if dtype == 'object':
+            continue
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        if not df[col].isna().any():
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_csv_chunks(source, chunksize, columns=None):
+    """
+    Yield a CSV as DataFrames of at most `chunksize` rows, reading only the requested
+    schema columns. Numbers are coerced per chunk, so a malformed value in one chunk
+    becomes NaN there instead of failing the whole read.
+    """
+    columns = list(columns or DATASET_SCHEMA)
+    dtypes = {col: DATASET_SCHEMA[col] for col in columns}
+    reader = pd.read_csv(_open_source(source), usecols=columns, dtype=text_dtypes(dtypes),
+                         chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            yield coerce_numeric(chunk, dtypes)
+
+
+def sidecar_path(filepath):
+    """Return the path of the columnar sidecar kept next to a CSV file"""
+    return os.fspath(filepath) + SIDECAR_SUFFIX
+
+
+def _schema_tag():
+    """Identify the schema a sidecar was written with"""
+    return ','.join(f'{col}:{dtype}' for col, dtype in DATASET_SCHEMA.items())
+
+
+def _read_sidecar_metadata(filepath):
+    """Return the source size/mtime/hash recorded in a usable sidecar, or None"""
+    if pa is None or not USE_COLUMNAR_SIDECAR:
+        return None
+    path = sidecar_path(filepath)
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path) as source:
+            metadata = ipc.open_file(source).schema.metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = {key.decode(): value.decode() for key, value in metadata.items()}
+    if metadata.get('schema') != _schema_tag():
+        return None
+    return {
+        'signature': (int(metadata['source_size']), int(metadata['source_mtime_ns'])),
+        'source_hash': metadata['source_hash']
+    }
+
+
+def _sidecar_is_current(filepath):
+    """Check the sidecar against the source CSV's size, mtime and content hash"""
+    metadata = _read_sidecar_metadata(filepath)
+    if metadata is None:
+        return False
+    signature = _file_signature(filepath)
+    if metadata['signature'] == signature:
+        return True
+    if metadata['signature'][0] != signature[0]:
+        return False
+    # Same size but touched: only the content hash can tell
+    return file_fingerprint(filepath) == metadata['source_hash']
+
+
+def write_sidecar(filepath, df):
+    """Write a frame as an uncompressed Arrow IPC sidecar for its source CSV"""
+    signature = _file_signature(filepath)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        'schema': _schema_tag(),
+        'source_size': str(signature[0]),
+        'source_mtime_ns': str(signature[1]),
+        'source_hash': file_fingerprint(filepath)
+    })
+    path = sidecar_path(filepath)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def read_sidecar(filepath, columns=None):
+    """Memory-map a sidecar and materialize only the requested columns"""
+    with pa.memory_map(sidecar_path(filepath)) as source:
+        table = ipc.open_file(source).read_all()
+    return table.select(list(columns or DATASET_SCHEMA)).to_pandas(split_blocks=True)
+
+
+def read_dataset_file(filepath, columns=None):
+    """
+    Read a dataset CSV through its columnar sidecar, converting it on first read.
+    The sidecar is rebuilt whenever the CSV's size, mtime or content changes.
+    """
+    if pa is None or not USE_COLUMNAR_SIDECAR:
+        return parse_csv(filepath, columns)
+    if _sidecar_is_current(filepath):
+        return read_sidecar(filepath, columns)
+
+    df = parse_csv(filepath)
+    try:
+        write_sidecar(filepath, df)
+    except OSError:
+        # Read-only data directory: keep serving from the CSV
+        pass
+    if columns is None or list(columns) == list(df.columns):
+        return df
+    return df[list(columns)]
+
+
+def _float32_preserves(values):
+    """Check that float32 keeps every value at the decimal resolution it was recorded with"""
+    values = values[~np.isnan(values)]
+    narrowed = values.astype(np.float32).astype(np.float64)
+    for decimals in range(FLOAT32_MAX_DECIMALS + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            return np.array_equal(np.round(narrowed, decimals), values)
+    return False
+
+
+def compact_frame(df):
+    """
+    Return a memory-compact copy of a frame: low-cardinality text as categoricals,
+    integers downcast to the smallest signed type holding their range, and floats
+    as float32 where that loses no recorded precision.
+    """
+    compact = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            if series.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                series = series.astype('category')
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            # Signed types so differences of values cannot wrap around
+            series = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32:
+            if _float32_preserves(series.to_numpy(dtype='float64')):
+                series = series.astype(np.float32)
+        compact[col] = series
+    return pd.DataFrame(compact, index=df.index)
+
+
+def memory_report(df):
+    """
+    Per-column memory of a loaded dataset: bytes in its current dtypes next to
+    the bytes it would take in the plain schema dtypes, with the reduction factor.
+    """
+    rows = {}
+    for col in df.columns:
+        schema_dtype = DATASET_SCHEMA.get(col, df[col].dtype)
+        before = df[col].astype(schema_dtype).memory_usage(deep=True, index=False)
+        after = df[col].memory_usage(deep=True, index=False)
+        rows[col] = {'dtype': str(df[col].dtype), 'schema_bytes': before, 'compact_bytes': after}
+    report = pd.DataFrame.from_dict(rows, orient='index')
+    report.loc['Total'] = ['', report['schema_bytes'].sum(), report['compact_bytes'].sum()]
+    report['reduction'] = (report['schema_bytes'] / report['compact_bytes']).round(2)
+    return report
+
+
+def shared_store_path(fingerprint):
+    """Return the shared store file for a dataset's content hash under the current schema"""
+    tag = hashlib.blake2b(f'{_schema_tag()}|compact={COMPACT_DATASETS}'.encode(), digest_size=8).hexdigest()
+    return os.path.join(SHARED_STORE_DIR, f'{fingerprint}-{tag}.arrow')
+
+
+def write_shared_frame(path, df):
+    """
+    Write a frame to the shared store as a single-batch Arrow IPC file, so every
+    column maps back without copying. NaN stays a float value rather than
+    becoming an Arrow null, which would force a copy when mapped back.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    for i, col in enumerate(df.columns):
+        if df[col].dtype.kind == 'f':
+            table = table.set_column(i, table.field(i), pa.array(df[col].to_numpy()))
+    # Only processes of the same user share the store
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with pa.OSFile(temp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temp_path, path)
+
+
+def map_shared_frame(path, columns=None):
+    """
+    Return a frame whose columns point into a memory-mapped shared store file.
+    The mapping is opened once per process and kept while among the
+    DATASET_CACHE_SIZE most recently used; the frame is read-only.
+    """
+    with _cache_lock:
+        mapped = _shared_maps.get(path)
+        if mapped is None:
+            source = pa.memory_map(path)
+            mapped = _shared_maps.put(path, (source, ipc.open_file(source).read_all()))
+            try:
+                # Mark the file as in use, so pruning by age keeps it
+                os.utime(path)
+            except OSError:
+                pass
+    table = mapped[1]
+    return table.select(list(columns or DATASET_SCHEMA)).to_pandas(split_blocks=True)
+
+
+def shared_store_enabled():
+    return pa is not None and USE_SHARED_STORE
+
+
+def prune_shared_store(keep=None, max_age=SHARED_STORE_MAX_AGE, max_bytes=SHARED_STORE_MAX_BYTES):
+    """
+    Delete store files not used for `max_age` seconds, then the least recently
+    used ones while the store is larger than `max_bytes`. Processes that still
+    map a deleted file keep reading it; `keep` is never deleted.
+    """
+    files = []
+    for path in glob.glob(os.path.join(SHARED_STORE_DIR, '*.arrow')):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    now = time.time()
+    for mtime, size, path in files:
+        if path == keep or (now - mtime <= max_age and total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def shared_dataset(fingerprint, build, columns=None):
+    """
+    Return a dataset from the shared store, calling build() for the full frame
+    and storing it when no process has stored this content yet. If the store
+    cannot be written or read, the built frame is used directly.
+    """
+    path = shared_store_path(fingerprint)
+    df = None
+    if not os.path.exists(path):
+        df = build()
+        try:
+            write_shared_frame(path, df)
+        except OSError:
+            return select_columns(df, columns)
+        prune_shared_store(keep=path)
+    try:
+        return map_shared_frame(path, columns)
+    except (OSError, pa.ArrowInvalid):
+        return select_columns(build() if df is None else df, columns)
+
+
+def select_columns(df, columns):
+    """Return the requested columns of a frame (all of them for None) without copying when possible"""
+    if columns is None or list(columns) == list(df.columns):
+        return df
+    return df[list(columns)]
+
+
+def register_fingerprint(df, fingerprint):
+    """Record the content hash a loaded frame stands for (see dataset_fingerprint)"""
+    with _cache_lock:
+        _frame_fingerprints[id(df)] = fingerprint
+        weakref.finalize(df, _frame_fingerprints.pop, id(df), None)
+
+
+def _read_source(source, columns=None):
+    """Parse a dataset path or uploaded file, in compact dtypes unless disabled"""
+    if isinstance(source, (str, os.PathLike)):
+        df = read_dataset_file(os.fspath(source), columns)
+    else:
+        df = parse_csv(source, columns)
+    return compact_frame(df) if COMPACT_DATASETS else df
+
+
+def cached_dataset(fingerprint, build, columns=None, shared=True):
+    """
+    Return the dataset with a content hash from the in-process cache or the
+    shared store, calling build(columns) on a miss (columns=None builds the
+    full frame). Every loader hands its result to the caches through here.
+    With shared=False (uploads) the dataset never reaches the persistent store.
+    """
+    key = (fingerprint, tuple(columns or DATASET_SCHEMA))
+    df = _dataset_cache.get(key)
+    if df is not None:
+        return df
+
+    if shared and shared_store_enabled():
+        df = shared_dataset(fingerprint, lambda: build(None), columns)
+    else:
+        df = build(columns)
+    register_fingerprint(df, fingerprint)
+    return _dataset_cache.put(key, df)
+
+
+def load_dataset(source, columns=None):
+    """
+    Load the stress dataset from a path or uploaded file, memoized on its content hash.
+    Unless disabled in config, columns are stored in compact dtypes (see compact_frame)
+    and files on disk are served from the shared store (see shared_dataset).
+    The returned frame is shared between callers and must be treated as read-only.
+    """
+    return cached_dataset(source_fingerprint(source), lambda cols: _read_source(source, cols), columns,
+                          shared=isinstance(source, (str, os.PathLike)))
+
+
+def _concat_partitions(paths):
+    df = pd.concat([_read_source(path) for path in paths], ignore_index=True)
+    # Categories differ between partitions, so concat falls back to object columns
+    return compact_frame(df) if COMPACT_DATASETS else df
+
+
+def load_partitions(paths):
+    """
+    Load several CSV partitions as one dataset, memoized (and shared through
+    the store) on the combined content hash of the partitions.
+    """
+    fingerprint = hashlib.blake2b('|'.join(file_fingerprint(os.fspath(path)) for path in paths).encode(),
+                                  digest_size=16).hexdigest()
+    return cached_dataset(fingerprint, lambda cols: select_columns(_concat_partitions(paths), cols))
+
+
+def dataset_fingerprint(df):
+    """Return the content hash a loaded dataset was parsed from, or None"""
+    return _frame_fingerprints.get(id(df))
+
+
+def clear_dataset_cache():
+    """Drop all memoized datasets and this process's shared store mappings"""
+    _dataset_cache.clear()
+    _shared_maps.clear()
+
+
+def set_shared_store_dir(path):
+    """
+    Point this process's shared store at another directory, returning the previous
+    one. Used by the benchmark so it never clears the store other processes use.
+    """
+    global SHARED_STORE_DIR
+    clear_dataset_cache()
+    previous, SHARED_STORE_DIR = SHARED_STORE_DIR, path
+    return previous
+
+
+def clear_shared_store():
+    """Delete every file in this process's shared store directory"""
+    clear_dataset_cache()
+    for path in glob.glob(os.path.join(SHARED_STORE_DIR, '*.arrow')):
+        os.remove(path)
+
+
+def dataset_memo(df, name, build):
+    """
+    Return build(df), computed once per loaded dataset and dropped with it.
+    Used for indexes and summaries that only depend on the dataset itself.
+    """
+    key = (id(df), name)
+    with _cache_lock:
+        if key in _derived_cache:
+            return _derived_cache[key]
+    value = build(df)
+    with _cache_lock:
+        if key not in _derived_cache:
+            _derived_cache[key] = value
+            weakref.finalize(df, _derived_cache.pop, key, None)
+        return _derived_cache[key]
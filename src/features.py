@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from config import ACTIVITY_LEVELS, DERIVED_BINS
+
+
+def bin_codes(values, edges):
+    """
+    Vectorized bin lookup with right-closed intervals, like pd.cut.
+    Returns int8 codes, -1 for values outside the edges or missing.
+    """
+    values = np.asarray(values, dtype='float64')
+    codes = np.searchsorted(edges, values, side='left') - 1
+    codes[(codes < 0) | (codes >= len(edges) - 1) | np.isnan(values)] = -1
+    return codes.astype(np.int8)
+
+
+def binned(values, edges, labels):
+    """Categorical of fixed bins over a column, equivalent to pd.cut(values, edges, labels=labels)"""
+    codes = bin_codes(values, np.asarray(edges, dtype='float64'))
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+
+
+def quantile_binned(values, q, labels):
+    """Categorical of quantile bins, like pd.qcut but tolerant of repeated edges"""
+    values = np.asarray(values, dtype='float64')
+    present = values[~np.isnan(values)]
+    if len(present) == 0:
+        codes = np.full(len(values), -1, dtype=np.int8)
+        return pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+    edges = np.quantile(present, np.linspace(0, 1, q + 1))
+    # The lowest edge is inclusive, as with qcut
+    edges[0] = np.nextafter(edges[0], -np.inf)
+    return pd.Categorical.from_codes(bin_codes(values, edges), categories=labels, ordered=True)
+
+
+def activity_levels(values):
+    """Activity_Level quantile bins of working hours"""
+    _, q, labels = ACTIVITY_LEVELS
+    return quantile_binned(values, q, labels)
+
+
+def derive_features(df):
+    """
+    Derived dashboard columns, computed once per dataset: the DERIVED_BINS
+    categories, Activity_Level over the whole dataset and Promotion_Rate.
+    """
+    features = {name: binned(df[source], edges, labels)
+                for name, (source, edges, labels) in DERIVED_BINS.items()}
+    features['Activity_Level'] = activity_levels(df[ACTIVITY_LEVELS[0]])
+    features['Promotion_Rate'] = df['Monthly_Salary_INR'] / (df['Experience_Years'].astype('float64') + 1)
+    return pd.DataFrame(features, index=df.index)
+
+
+def with_derived_features(df):
+    """Return the dataset with its derived columns appended, sharing the original columns"""
+    return pd.concat([df, derive_features(df)], axis=1, copy=False)
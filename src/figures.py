@@ -0,0 +1,667 @@
+import json
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from caching import LRUCache
+from charts import box_figure, category_counts, histogram_figure, scatter_figure, violin_figure
+from config import (ACTIVITY_LEVEL_SCOPE, CHART_COLORS, CHART_THEME, FIGURE_CACHE_BYTES, FIGURE_CACHE_SIZE,
+                    NUMERIC_COLUMNS, VIOLIN_MAX_POINTS)
+from features import activity_levels
+from trendlines import add_trendlines, lowess_trends
+
+# Serialized Plotly JSON keyed by (filter state, chart id), bounded by total size
+_figure_cache = LRUCache(FIGURE_CACHE_SIZE, max_bytes=FIGURE_CACHE_BYTES, sizeof=len)
+
+
+class DataView:
+    """
+    A dataset under one sidebar filter state, as the figure builders see it: the
+    selected rows (materialized on first use), the dataset's cubes restricted by
+    the same filters, and a hashable state identifying both.
+    """
+
+    def __init__(self, selection, cubes, correlation_cube, filters, ranges, state):
+        self.selection = selection
+        self.cubes = cubes
+        self.correlation_cube = correlation_cube
+        self.filters = filters
+        self.ranges = ranges
+        self.state = state
+
+    @property
+    def frame(self):
+        return self.selection.frame()
+
+    def rollup(self, cube, by, metric, stat='mean'):
+        """Roll up one of the dataset's cubes under the view's filters"""
+        return self.cubes[cube].rollup(by, metric, stat, filters=self.filters, ranges=self.ranges)
+
+
+# Common chart layout settings
+def get_chart_layout():
+    return {
+        'plot_bgcolor': CHART_THEME['bgcolor'],
+        'paper_bgcolor': CHART_THEME['bgcolor'],
+        'font': {
+            'family': CHART_THEME['font_family'],
+            'color': CHART_THEME['axis_font_color']
+        },
+        'margin': dict(t=30, l=30, r=30, b=30),
+        'legend': {
+            'bgcolor': 'rgba(255,255,255,0.8)',
+            'bordercolor': '#E2E2E2',
+            'borderwidth': 1
+        }
+    }
+
+
+def stress_distribution(view):
+    fig = histogram_figure(view.frame, x='Stress_Level',
+                           nbins=11,
+                           color_discrete_sequence=[CHART_COLORS[0]],
+                           opacity=0.8,
+                           title="")
+    fig.update_layout(
+        **get_chart_layout(),
+        bargap=0.1,
+        height=400
+    )
+    fig.update_traces(
+        marker_line_color='white',
+        marker_line_width=1
+    )
+    return fig
+
+
+def department_stress(view):
+    fig = box_figure(view.frame, x='Department', y='Stress_Level',
+                     color='Department',
+                     color_discrete_sequence=CHART_COLORS,
+                     title="")
+    fig.update_layout(
+        **get_chart_layout(),
+        xaxis={'tickangle': 45},
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+
+def correlation_heatmap(view):
+    corr_cols = NUMERIC_COLUMNS
+    # Merge the per-cell partials of the current filter state
+    corr_matrix = view.correlation_cube.accumulator(view.filters, view.ranges).correlation().round(2)
+    # Add correlation annotations
+    annotations = []
+    for i, row in enumerate(corr_matrix.values):
+        for j, value in enumerate(row):
+            annotations.append(
+                dict(
+                    x=corr_cols[j],
+                    y=corr_cols[i],
+                    text=f"{value:.2f}",
+                    font=dict(size=12),
+                    showarrow=False
+                )
+            )
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix,
+        x=corr_cols,
+        y=corr_cols,
+        hoverongaps=False,
+        colorscale=[
+            [0.0, '#d73027'],      # Strong negative correlation (red)
+            [0.25, '#f46d43'],     # Moderate negative correlation
+            [0.5, '#ffffff'],      # No correlation (white)
+            [0.75, '#74add1'],     # Moderate positive correlation
+            [1.0, '#4575b4']       # Strong positive correlation (blue)
+        ],
+        zmid=0,
+        zmin=-1,
+        zmax=1
+    ))
+    fig.update_layout(
+        **get_chart_layout(),
+        height=500,
+        xaxis={'tickangle': 45},
+        yaxis={'tickangle': 0},
+        annotations=annotations,
+        coloraxis_colorbar=dict(
+            title="Correlation",
+            titleside="right",
+            thickness=15,
+            len=0.7,
+            tickmode="array",
+            ticktext=["-1", "-0.5", "0", "0.5", "1"],
+            tickvals=[-1, -0.5, 0, 0.5, 1],
+            ticks="outside"
+        )
+    )
+    return fig
+
+
+def working_hours_distribution(view):
+    fig = histogram_figure(view.frame,
+                           x='Working_Hours_per_Week',
+                           nbins=20,
+                           color_discrete_sequence=[CHART_COLORS[1]],
+                           title="Distribution of Working Hours")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def overtime_stress(view):
+    hours_cube = view.cubes['Working_Hours_per_Week']
+    overtime_threshold = hours_cube.median('Working_Hours_per_Week', view.filters, view.ranges)
+    overtime = hours_cube.split_rollup(['Department'], 'Stress_Level',
+                                       'Working_Hours_per_Week', overtime_threshold,
+                                       'Overtime', view.filters, view.ranges)
+    fig = px.bar(overtime,
+                 x='Department',
+                 y='Stress_Level',
+                 color='Overtime',
+                 barmode='group',
+                 color_discrete_sequence=[CHART_COLORS[2], CHART_COLORS[3]],
+                 title="Impact of Overtime on Stress Levels")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+def sleep_distribution(view):
+    sleep_dist = category_counts(view.frame['Sleep_Category']).reset_index()
+    fig = px.pie(sleep_dist,
+                 values='count',
+                 names='Sleep_Category',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Sleep Duration Distribution")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def sleep_stress(view):
+    sleep_stress = view.rollup('Sleep_Category', ['Sleep_Category'], 'Stress_Level').reset_index()
+    fig = px.bar(sleep_stress,
+                 x='Sleep_Category',
+                 y='Stress_Level',
+                 color_discrete_sequence=[CHART_COLORS[4]],
+                 title="Average Stress Level by Sleep Duration")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def sleep_quality_impact(view):
+    sleep_impact = view.rollup('Sleep_Quality', ['Sleep_Quality'], 'Stress_Level',
+                               ['mean', 'count', 'std']).reset_index()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=sleep_impact['Sleep_Quality'],
+        y=sleep_impact['mean'],
+        error_y=dict(type='data', array=sleep_impact['std']),
+        marker_color=CHART_COLORS[0],
+        name='Average Stress'
+    ))
+    fig.update_layout(
+        **get_chart_layout(),
+        title="Sleep Quality Impact on Stress",
+        height=400,
+        xaxis_title="Sleep Quality",
+        yaxis_title="Average Stress Level"
+    )
+    return fig
+
+
+def sleep_stress_trend(view):
+    fig = scatter_figure(view.frame,
+                         x='Sleep_Hours',
+                         y='Stress_Level',
+                         color='Department',
+                         color_discrete_sequence=CHART_COLORS,
+                         title="Sleep Hours vs Stress Level Trend")
+    # Binned LOWESS per department, cached per filter state
+    trends = lowess_trends(view.frame, 'Sleep_Hours', 'Stress_Level',
+                           group='Department', cache_key=view.state)
+    add_trendlines(fig, trends, CHART_COLORS)
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def activity_stress(view):
+    filtered_df = view.frame
+    activity = filtered_df['Activity_Level']
+    if ACTIVITY_LEVEL_SCOPE == 'filter':
+        # Quartiles of the filtered employees rather than the whole dataset
+        activity = pd.Series(activity_levels(filtered_df['Working_Hours_per_Week']),
+                             index=filtered_df.index, name='Activity_Level')
+    activity_impact = filtered_df['Stress_Level'].groupby(activity, observed=False).mean().reset_index()
+    fig = px.line(activity_impact,
+                  x='Activity_Level',
+                  y='Stress_Level',
+                  markers=True,
+                  color_discrete_sequence=[CHART_COLORS[2]],
+                  title="Physical Activity Level vs Stress")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def department_hours(view):
+    fig = box_figure(view.frame,
+                     x='Department',
+                     y='Working_Hours_per_Week',
+                     color='Department',
+                     color_discrete_sequence=CHART_COLORS,
+                     title="Working Hours Distribution by Department")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45},
+        showlegend=False
+    )
+    return fig
+
+
+def burnout_distribution(view):
+    burnout_dist = category_counts(view.frame['Burnout_Risk']).reset_index()
+    fig = px.pie(burnout_dist,
+                 values='count',
+                 names='Burnout_Risk',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Burnout Risk Distribution")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def burnout_factors(view):
+    # One box per factor column, without melting the frame
+    fig = box_figure(view.frame,
+                     x='Factor',
+                     y=['Working_Hours_per_Week', 'Sleep_Hours', 'Work_Life_Balance'],
+                     value_name='Value',
+                     color_discrete_sequence=CHART_COLORS[3:6],
+                     title="Key Burnout Factors Analysis")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def remote_stress(view):
+    remote_stress = view.rollup('Remote_Work', ['Remote_Work'], 'Stress_Level')
+    remote_df = pd.DataFrame({
+        'Remote_Work': remote_stress.index,
+        'Average_Stress': remote_stress.values
+    })
+    fig = px.bar(remote_df, x='Remote_Work', y='Average_Stress',
+                 labels={'x': 'Remote Work', 'y': 'Average Stress Level'},
+                 color_discrete_sequence=[CHART_COLORS[2]],
+                 text=remote_stress.values.round(2),
+                 title="")
+    fig.update_layout(
+        **get_chart_layout(),
+        bargap=0.3,
+        height=400
+    )
+    return fig
+
+
+def balance_stress(view):
+    fig = scatter_figure(view.frame,
+                         x='Work_Life_Balance',
+                         y='Stress_Level',
+                         color='Department',
+                         color_discrete_sequence=CHART_COLORS,
+                         opacity=0.7,
+                         size='Experience_Years',
+                         hover_data=['Job_Role', 'Age'],
+                         title="")
+    fig.update_layout(
+        **get_chart_layout(),
+        hovermode='closest',
+        showlegend=True,
+        height=400
+    )
+    return fig
+
+
+def age_distribution(view):
+    fig = violin_figure(view.frame,
+                        y='Age',
+                        x='Department',
+                        box=True,
+                        color_discrete_sequence=CHART_COLORS,
+                        title="Age Distribution by Department")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def age_group_stress(view):
+    age_stress = view.rollup('Age_Group', ['Age_Group'], 'Stress_Level').reset_index()
+    fig = px.line(age_stress,
+                  x='Age_Group',
+                  y='Stress_Level',
+                  markers=True,
+                  color_discrete_sequence=[CHART_COLORS[0]],
+                  title="Average Stress Level by Age Group")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def remote_department_stress(view):
+    remote_work_stress = view.rollup('Remote_Work', ['Remote_Work', 'Department'], 'Stress_Level').reset_index()
+    fig = px.bar(remote_work_stress,
+                 x='Department',
+                 y='Stress_Level',
+                 color='Remote_Work',
+                 barmode='group',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Stress Levels: Remote vs Office Work")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+def remote_balance(view):
+    remote_balance = view.rollup('Remote_Work', ['Remote_Work'], 'Work_Life_Balance').reset_index()
+    fig = px.pie(remote_balance,
+                 values='Work_Life_Balance',
+                 names='Remote_Work',
+                 hole=0.4,
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Work-Life Balance Distribution")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def department_matrix(view):
+    dept_matrix = view.rollup(None, ['Department'],
+                              ['Stress_Level', 'Working_Hours_per_Week', 'Monthly_Salary_INR']).reset_index()
+    fig = px.scatter(dept_matrix,
+                     x='Working_Hours_per_Week',
+                     y='Stress_Level',
+                     size='Monthly_Salary_INR',
+                     color='Department',
+                     color_discrete_sequence=CHART_COLORS,
+                     title="Department Performance Matrix")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def department_stress_violin(view):
+    fig = violin_figure(view.frame,
+                        y='Stress_Level',
+                        x='Department',
+                        box=True,
+                        points=True,
+                        max_points=VIOLIN_MAX_POINTS,
+                        color_discrete_sequence=CHART_COLORS,
+                        title="Detailed Department Stress Distribution")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        showlegend=False,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+def _team_size_rollups(view):
+    """Per-department sums and counts, and the size category of each department"""
+    size_metrics = ['Working_Hours_per_Week', 'Work_Life_Balance', 'Stress_Level']
+    dept_sums = view.rollup(None, ['Department'], size_metrics, 'sum')
+    dept_counts = view.rollup(None, ['Department'], size_metrics, 'count')
+    size_mapping = {}
+
+    # Manual categorization based on department sizes
+    for dept in dept_counts.index:
+        # Since all departments have equal size (~2,730 employees)
+        size_mapping[dept] = 'Standard'
+    return dept_sums, dept_counts, size_mapping
+
+
+def team_size_stress(view):
+    dept_sums, dept_counts, size_mapping = _team_size_rollups(view)
+    # Each department falls in one size category, so its mean is the cell mean
+    team_stress = (dept_sums['Stress_Level'] / dept_counts['Stress_Level']).reset_index()
+    team_stress.insert(0, 'Team_Size', team_stress['Department'].map(size_mapping))
+    team_stress = team_stress.sort_values(['Team_Size', 'Department'], kind='stable')
+    fig = px.bar(team_stress,
+                 x='Department',
+                 y='Stress_Level',
+                 color='Team_Size',
+                 barmode='group',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Department Stress Levels by Size Category")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+def team_size_metrics(view):
+    dept_sums, dept_counts, size_mapping = _team_size_rollups(view)
+    efficiency_metrics = (
+        dept_sums.groupby(size_mapping).sum() / dept_counts.groupby(size_mapping).sum()
+    ).rename_axis('Team_Size').reset_index()
+    efficiency_metrics_long = pd.melt(efficiency_metrics,
+                                      id_vars=['Team_Size'],
+                                      var_name='Metric',
+                                      value_name='Value')
+    fig = px.line(efficiency_metrics_long,
+                  x='Team_Size',
+                  y='Value',
+                  color='Metric',
+                  markers=True,
+                  color_discrete_sequence=CHART_COLORS,
+                  title="Size Category Impact on Key Metrics")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def gender_department_stress(view):
+    gender_dept_stress = view.rollup(None, ['Gender', 'Department'], 'Stress_Level').reset_index()
+    fig = px.bar(gender_dept_stress,
+                 x='Department',
+                 y='Stress_Level',
+                 color='Gender',
+                 barmode='group',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Stress Levels by Gender Across Departments")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+def gender_salary(view):
+    fig = box_figure(view.frame,
+                     x='Gender',
+                     y='Monthly_Salary_INR',
+                     color='Gender',
+                     points="all",
+                     color_discrete_sequence=CHART_COLORS,
+                     title="Salary Distribution by Gender")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        showlegend=False
+    )
+    return fig
+
+
+def gender_balance(view):
+    balance_gender = view.rollup('Work_Life_Balance', ['Gender', 'Work_Life_Balance'],
+                                 'Stress_Level').reset_index()
+    fig = px.line(balance_gender,
+                  x='Work_Life_Balance',
+                  y='Stress_Level',
+                  color='Gender',
+                  markers=True,
+                  color_discrete_sequence=CHART_COLORS,
+                  title="Work-Life Balance Impact by Gender")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def experience_salary(view):
+    fig = scatter_figure(view.frame,
+                         x='Experience_Years',
+                         y='Monthly_Salary_INR',
+                         color='Gender',
+                         color_discrete_sequence=CHART_COLORS,
+                         title="Experience-Salary Relationship by Gender")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400
+    )
+    return fig
+
+
+def department_gender_share(view):
+    dept_gender = view.rollup(None, ['Department', 'Gender'], 'Stress_Level', 'size').unstack(fill_value=0)
+    dept_gender = dept_gender.div(dept_gender.sum(axis=1), axis=0) * 100
+    dept_gender_long = dept_gender.reset_index().melt(id_vars=['Department'],
+                                                      var_name='Gender',
+                                                      value_name='Percentage')
+    fig = px.bar(dept_gender_long,
+                 x='Department',
+                 y='Percentage',
+                 color='Gender',
+                 barmode='stack',
+                 color_discrete_sequence=CHART_COLORS,
+                 title="Gender Distribution by Department (%)")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45},
+        yaxis_title="Percentage (%)"
+    )
+    return fig
+
+
+def career_progression(view):
+    fig = box_figure(view.frame,
+                     x='Department',
+                     y='Promotion_Rate',
+                     color='Gender',
+                     color_discrete_sequence=CHART_COLORS,
+                     title="Career Progression Analysis")
+    fig.update_layout(
+        **get_chart_layout(),
+        height=400,
+        xaxis={'tickangle': 45}
+    )
+    return fig
+
+
+# Dashboard charts by chart id
+FIGURE_BUILDERS = {
+    'stress_distribution': stress_distribution,
+    'department_stress': department_stress,
+    'correlation_heatmap': correlation_heatmap,
+    'working_hours_distribution': working_hours_distribution,
+    'overtime_stress': overtime_stress,
+    'sleep_distribution': sleep_distribution,
+    'sleep_stress': sleep_stress,
+    'sleep_quality_impact': sleep_quality_impact,
+    'sleep_stress_trend': sleep_stress_trend,
+    'activity_stress': activity_stress,
+    'department_hours': department_hours,
+    'burnout_distribution': burnout_distribution,
+    'burnout_factors': burnout_factors,
+    'remote_stress': remote_stress,
+    'balance_stress': balance_stress,
+    'age_distribution': age_distribution,
+    'age_group_stress': age_group_stress,
+    'remote_department_stress': remote_department_stress,
+    'remote_balance': remote_balance,
+    'department_matrix': department_matrix,
+    'department_stress_violin': department_stress_violin,
+    'team_size_stress': team_size_stress,
+    'team_size_metrics': team_size_metrics,
+    'gender_department_stress': gender_department_stress,
+    'gender_salary': gender_salary,
+    'gender_balance': gender_balance,
+    'experience_salary': experience_salary,
+    'department_gender_share': department_gender_share,
+    'career_progression': career_progression
+}
+
+
+def build_figure(chart_id, view):
+    """Build a dashboard chart for a data view"""
+    return FIGURE_BUILDERS[chart_id](view)
+
+
+def figure_json(chart_id, view):
+    """
+    Plotly JSON of a dashboard chart, cached by (filter state, chart id).
+    Views without a state (no dataset fingerprint) are always rebuilt.
+    """
+    if view.state is None or view.state[0] is None:
+        return build_figure(chart_id, view).to_json()
+    key = (view.state, chart_id)
+    return _figure_cache.get_or_compute(key, lambda: build_figure(chart_id, view).to_json())
+
+
+def figure_from_json(spec):
+    """
+    Restore a Figure from figure_json(). The JSON was produced from a validated
+    figure, so it is restored without validating every property again.
+    """
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+def clear_figure_cache():
+    """Drop all cached figures"""
+    _figure_cache.clear()
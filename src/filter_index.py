@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Candidate sets above this share of the rows are ordered with a row mask instead of a sort
+_MASK_FRACTION = 0.125
+
+
+class RowSelection:
+    """Sorted row positions into a dataset; rows are only copied on demand"""
+
+    def __init__(self, df, positions):
+        self.df = df
+        self.positions = positions
+        self._frame = None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def column(self, name):
+        """Return the selected values of a single column as a NumPy array"""
+        return self.df[name].to_numpy()[self.positions]
+
+    def frame(self):
+        """Materialize the selected rows as a DataFrame (cached)"""
+        if self._frame is None:
+            self._frame = self.df.take(self.positions)
+        return self._frame
+
+
+class FilterIndex:
+    """
+    Index over the sidebar filter columns of one dataset.
+    Categorical columns keep a packed row bitmap and a posting list per value,
+    the range column keeps its row positions sorted by value.
+    """
+
+    def __init__(self, df, category_columns=('Department', 'Gender'), range_column='Experience_Years'):
+        self.df = df
+        self.n_rows = len(df)
+        self.categories = {}
+        self.bitmaps = {}
+        self.postings = {}
+        for col in category_columns:
+            codes, uniques = pd.factorize(df[col])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.categories[col] = {value: code for code, value in enumerate(uniques)}
+            self.postings[col] = [order[bounds[i]:bounds[i + 1]] for i in range(len(uniques))]
+            self.bitmaps[col] = [np.packbits(codes == i) for i in range(len(uniques))]
+
+        self.range_column = range_column
+        values = df[range_column].to_numpy(dtype='float64')
+        self.range_order = np.argsort(values, kind='stable')
+        self.range_values = values[self.range_order]
+
+    def options(self, col):
+        """Return the distinct values of a categorical filter column"""
+        return list(self.categories[col])
+
+    def _category_candidates(self, col, values):
+        """Return the posting lists and a combined bitmap for the selected values"""
+        codes = [self.categories[col][v] for v in values if v in self.categories[col]]
+        if not codes:
+            return [], None
+        bitmap = self.bitmaps[col][codes[0]]
+        for code in codes[1:]:
+            bitmap = bitmap | self.bitmaps[col][code]
+        return [self.postings[col][code] for code in codes], bitmap
+
+    @staticmethod
+    def _test_bits(bitmap, positions):
+        """Look up the bits of a packed bitmap at the given row positions"""
+        return ((bitmap[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+    def select(self, filters=None, value_range=None):
+        """
+        Return a RowSelection for the rows matching every filter.
+        `filters` maps categorical columns to the accepted values (empty means all),
+        `value_range` is an inclusive (low, high) bound on the range column.
+        The smallest candidate set drives the lookup and is checked against the
+        other filters' bitmaps, so cost follows the result size, not the dataset.
+        """
+        candidates = []
+        for col, values in (filters or {}).items():
+            if values is None or len(values) == 0:
+                continue
+            postings, bitmap = self._category_candidates(col, values)
+            if bitmap is None:
+                return RowSelection(self.df, np.empty(0, dtype=np.int64))
+            candidates.append((sum(len(p) for p in postings), postings, bitmap))
+
+        if value_range is not None:
+            lo = np.searchsorted(self.range_values, value_range[0], side='left')
+            hi = np.searchsorted(self.range_values, value_range[1], side='right')
+            candidates.append((hi - lo, [self.range_order[lo:hi]], None))
+
+        if not candidates:
+            return RowSelection(self.df, np.arange(self.n_rows))
+
+        driver = min(range(len(candidates)), key=lambda i: candidates[i][0])
+        size, postings = candidates[driver][:2]
+        if size == self.n_rows:
+            # Only possible when the driver covers every row; all others do too
+            return RowSelection(self.df, np.arange(self.n_rows))
+        if len(postings) == 1 and candidates[driver][2] is not None:
+            positions = postings[0]
+        elif size > _MASK_FRACTION * self.n_rows:
+            # A large share of the rows: marking them in a mask is cheaper than sorting
+            mask = np.zeros(self.n_rows, dtype=bool)
+            for posting in postings:
+                mask[posting] = True
+            positions = np.flatnonzero(mask)
+        else:
+            # Several posting lists, or a range slice ordered by value
+            positions = np.sort(np.concatenate(postings))
+
+        for i, (_, _, bitmap) in enumerate(candidates):
+            if i == driver:
+                continue
+            if bitmap is None:
+                # Range check on the surviving candidates only
+                values = self.df[self.range_column].to_numpy()[positions]
+                positions = positions[(values >= value_range[0]) & (values <= value_range[1])]
+            else:
+                positions = positions[self._test_bits(bitmap, positions)]
+        return RowSelection(self.df, positions)
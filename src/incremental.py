@@ -0,0 +1,219 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregation import plain_label
+from config import (APPEND_KEY_COLUMN, APPEND_MODE, APPEND_STATE_SUFFIX, DATASET_SCHEMA, HOURS_SAMPLE_SIZE,
+                    STREAM_CHUNK_SIZE)
+from data_loader import coerce_numeric, text_dtypes
+from ingestion import read_header
+from streaming import REPORT_COLUMNS, ReportAccumulator, report_requests
+
+# Ways of finding the rows appended since the last refresh
+APPEND_MODES = ('offset', 'rows', 'key')
+
+# Bytes just before the recorded offset that must be unchanged for the file to count as appended to
+_TAIL_BYTES = 1 << 16
+
+# Errors that make a saved state unusable; the report is then rebuilt
+_STATE_ERRORS = (OSError, ValueError, KeyError, IndexError, TypeError)
+
+
+def state_path(filepath):
+    """Return the path of the report state kept next to a CSV file"""
+    return os.fspath(filepath) + APPEND_STATE_SUFFIX
+
+
+def _state_tag():
+    """Identify the schema and report definition a state was accumulated under"""
+    definition = repr((DATASET_SCHEMA, REPORT_COLUMNS, report_requests(), HOURS_SAMPLE_SIZE))
+    return hashlib.blake2b(definition.encode(), digest_size=8).hexdigest()
+
+
+class AppendState:
+    """
+    Batch report aggregates of one CSV and how far into the file they reach:
+    the byte offset after the last complete line folded in, the number of rows,
+    the largest key seen and a hash of the bytes just before the offset.
+    """
+
+    def __init__(self, header, seed=0):
+        self.tag = _state_tag()
+        self.header = header
+        self.report = ReportAccumulator(seed=seed)
+        self.offset = 0
+        self.rows = 0
+        self.last_key = None
+        self.tail_hash = None
+        self.signature = None
+
+    def fold(self, chunks, key=None):
+        """Fold parsed chunks of new rows into the report; returns the number of rows"""
+        added = 0
+        for chunk in chunks:
+            self.report.update(chunk)
+            added += len(chunk)
+            if key in chunk.columns and chunk[key].notna().any():
+                chunk_max = plain_label(chunk[key].max())
+                self.last_key = chunk_max if self.last_key is None else max(self.last_key, chunk_max)
+        self.rows += added
+        return added
+
+    def to_json(self):
+        return json.dumps({
+            'tag': self.tag,
+            'header': self.header,
+            'offset': self.offset,
+            'rows': self.rows,
+            'last_key': self.last_key,
+            'tail_hash': self.tail_hash,
+            'signature': self.signature,
+            'report': self.report.state()
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        state = cls(data['header'])
+        if data['tag'] != state.tag:
+            raise ValueError('report state was written for another schema or report definition')
+        state.offset, state.rows, state.last_key = int(data['offset']), int(data['rows']), data['last_key']
+        state.tail_hash = data['tail_hash']
+        state.signature = tuple(data['signature']) if data['signature'] is not None else None
+        state.report = ReportAccumulator.from_state(data['report'])
+        return state
+
+
+def load_state(filepath):
+    """Return the saved report state of a CSV, or None when missing, unreadable or outdated"""
+    try:
+        with open(state_path(filepath), encoding='utf-8') as f:
+            return AppendState.from_json(f.read())
+    except _STATE_ERRORS:
+        return None
+
+
+def save_state(filepath, state):
+    """Write a report state next to its CSV, replacing the previous one atomically"""
+    path = state_path(filepath)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(state.to_json())
+    os.replace(temp_path, path)
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only stream over bytes [start, end) of a binary file"""
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self.f = f
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = self.f.readinto(memoryview(buffer)[:min(len(buffer), self.remaining)])
+        self.remaining -= n
+        return n
+
+
+def _tail_hash(f, offset):
+    f.seek(max(0, offset - _TAIL_BYTES))
+    return hashlib.blake2b(f.read(min(offset, _TAIL_BYTES)), digest_size=16).hexdigest()
+
+
+def _complete_end(f, size):
+    """Position just after the last newline, so a row still being written is left for later"""
+    end = size
+    while end > 0:
+        start = max(0, end - _TAIL_BYTES)
+        f.seek(start)
+        newline = f.read(end - start).rfind(b'\n')
+        if newline >= 0:
+            return start + newline + 1
+        end = start
+    return 0
+
+
+def _read_rows(f, start, end, header, columns, chunksize, **options):
+    """Parse report columns of the CSV rows in bytes [start, end) in chunks, coercing numbers"""
+    if end <= start:
+        return []
+    dtypes = {col: DATASET_SCHEMA[col] for col in columns if col in DATASET_SCHEMA}
+    reader = pd.read_csv(io.BufferedReader(_ByteRange(f, start, end)), header=None, names=header,
+                         usecols=columns, dtype=text_dtypes(dtypes), chunksize=chunksize, **options)
+
+    def chunks():
+        with reader:
+            for chunk in reader:
+                yield coerce_numeric(chunk, dtypes)
+    return chunks()
+
+
+def _old_key_rows(state, f, end, header, key):
+    """Positions of the rows in bytes [offset, end) whose key was already folded in"""
+    if state.last_key is None or end <= state.offset:
+        return None
+    keys = pd.read_csv(io.BufferedReader(_ByteRange(f, state.offset, end)), header=None, names=header,
+                       usecols=[key])[key]
+    return set(np.flatnonzero(~(keys > state.last_key).to_numpy()).tolist())
+
+
+def _continues(state, header, f, size):
+    """Check that a saved state still describes the start of the file, byte for byte"""
+    if state is None or state.header != header or size < state.offset:
+        return False
+    return state.offset == 0 or _tail_hash(f, state.offset) == state.tail_hash
+
+
+def refresh_report(filepath, mode=APPEND_MODE, key=APPEND_KEY_COLUMN, chunksize=STREAM_CHUNK_SIZE, save=True):
+    """
+    Bring the batch report of a CSV up to date, parsing only the rows appended
+    since the saved state was written, and save the new state next to the file.
+    In every mode the saved state must still match the start of the file (same
+    header, and the same bytes just before the saved offset) or the report is
+    rebuilt, and a last line without a newline is left for the next refresh.
+    New rows are then those after the saved byte offset ('offset' and 'rows',
+    since the verified prefix holds exactly the saved row count), or those after
+    the offset whose key is above the largest one seen, so re-sent rows are
+    skipped ('key').
+    Returns the ReportAccumulator and the number of rows folded in.
+    """
+    if mode not in APPEND_MODES:
+        raise ValueError(f"Unknown append mode {mode!r}; expected one of {', '.join(APPEND_MODES)}")
+    filepath = os.fspath(filepath)
+    with open(filepath, 'rb') as f:
+        header = read_header(f)
+        if mode == 'key' and key not in header:
+            raise ValueError(f"{filepath} has no key column {key!r}")
+        stat = os.fstat(f.fileno())
+        state = load_state(filepath)
+        if state is not None and state.signature == (stat.st_size, stat.st_mtime_ns) and state.header == header:
+            return state.report, 0
+        if not _continues(state, header, f, stat.st_size):
+            state = AppendState(header)
+        f.seek(0)
+        state.offset = max(state.offset, len(f.readline()))
+        end = _complete_end(f, stat.st_size)
+
+        columns = REPORT_COLUMNS + ([key] if key in header and key not in REPORT_COLUMNS else [])
+        skiprows = _old_key_rows(state, f, end, header, key) if mode == 'key' else None
+        chunks = _read_rows(f, state.offset, end, header, columns, chunksize, skiprows=skiprows)
+        added = state.fold(chunks, key)
+        state.offset = max(state.offset, end)
+        state.tail_hash = _tail_hash(f, state.offset)
+        state.signature = (stat.st_size, stat.st_mtime_ns)
+
+    if save:
+        try:
+            save_state(filepath, state)
+        except OSError:
+            # Read-only data directory: the next refresh starts over
+            pass
+    return state.report, added
@@ -0,0 +1,145 @@
+import codecs
+import csv
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from caching import LRUCache
+from config import (CATEGORY_MAX_UNIQUE_RATIO, COMPACT_DATASETS, DATASET_SCHEMA, STREAM_CHUNK_SIZE,
+                    UPLOAD_MAX_BYTES, UPLOAD_MAX_ROWS)
+from data_loader import cached_dataset, coerce_numeric, compact_frame, hash_stream, select_columns, text_dtypes
+
+# Content hashes of uploads already ingested, keyed by the uploader's file identity
+_upload_fingerprints = LRUCache(16)
+
+
+class UploadError(ValueError):
+    """An uploaded dataset that cannot be ingested, with a message fit for the user"""
+
+
+def upload_size(source):
+    """Size in bytes of an uploaded file object"""
+    size = getattr(source, 'size', None)
+    if size is None:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    return size
+
+
+def read_header(source):
+    """Return the column names on the first line of an upload, leaving the stream rewound"""
+    source.seek(0)
+    line = source.readline()
+    source.seek(0)
+    if isinstance(line, bytes):
+        line = codecs.decode(line, 'utf-8-sig', errors='replace')
+    return [name.strip() for name in next(csv.reader([line]), [])]
+
+
+def validate_upload(source, max_bytes=UPLOAD_MAX_BYTES):
+    """Check an upload's size and header against the dataset schema before parsing it"""
+    size = upload_size(source)
+    if size > max_bytes:
+        raise UploadError(f"The file is {size / 2 ** 20:,.0f} MB; uploads are limited to "
+                          f"{max_bytes / 2 ** 20:,.0f} MB.")
+    header = read_header(source)
+    if not header or header == ['']:
+        raise UploadError("The file is empty.")
+    missing = [col for col in DATASET_SCHEMA if col not in header]
+    if missing:
+        raise UploadError(f"The file is missing required column(s): {', '.join(missing)}.")
+    return size
+
+
+def _compact_chunk(chunk):
+    """
+    Store a chunk's text columns as categoricals and, when compacting, its numbers
+    in the smallest dtypes, so parsed chunks stay small until they are combined
+    """
+    for col, dtype in DATASET_SCHEMA.items():
+        if dtype == 'object':
+            chunk[col] = chunk[col].astype('category')
+    return compact_frame(chunk) if COMPACT_DATASETS else chunk
+
+
+def _combine_chunks(chunks):
+    """
+    Concatenate parsed chunks into one frame with the dtypes compact_frame gives a
+    whole-file parse: text columns become categoricals with sorted categories when
+    they are low-cardinality across all rows, and plain text otherwise. Numeric
+    dtypes that differ between chunks are widened by the concat and narrowed
+    again by compact_frame over all rows.
+    """
+    n_rows = sum(len(chunk) for chunk in chunks)
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            combined = pd.Series(union_categoricals(parts, sort_categories=True), name=col)
+            if not COMPACT_DATASETS or len(combined.cat.categories) > CATEGORY_MAX_UNIQUE_RATIO * n_rows:
+                combined = combined.astype(object)
+            columns[col] = combined
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    df = pd.DataFrame(columns)
+    return compact_frame(df) if COMPACT_DATASETS else df
+
+
+def parse_upload(source, size, chunksize=STREAM_CHUNK_SIZE, max_rows=UPLOAD_MAX_ROWS, progress=None):
+    """
+    Parse a validated upload in chunks of `chunksize` rows, reading straight from
+    the uploaded stream. `progress(fraction, rows)` is called after every chunk.
+    """
+    dtypes = dict(DATASET_SCHEMA)
+    chunks, rows = [], 0
+    source.seek(0)
+    reader = pd.read_csv(source, usecols=list(dtypes), dtype=text_dtypes(dtypes), chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            rows += len(chunk)
+            if rows > max_rows:
+                raise UploadError(f"The file has more than {max_rows:,} rows, the upload limit.")
+            chunks.append(_compact_chunk(coerce_numeric(chunk, dtypes)))
+            if progress is not None:
+                progress(min(source.tell() / size, 1.0) if size else 1.0, rows)
+    if not rows:
+        raise UploadError("The file has a header but no data rows.")
+    return _combine_chunks(chunks)
+
+
+def upload_fingerprint(source):
+    """Content hash of an upload, computed once per uploaded file"""
+    identity = getattr(source, 'file_id', None) or getattr(source, 'id', None)
+    key = (identity, getattr(source, 'name', None), upload_size(source)) if identity is not None else None
+    if key is not None and key in _upload_fingerprints:
+        return _upload_fingerprints.get(key)
+    source.seek(0)
+    digest = hash_stream(source)
+    source.seek(0)
+    if key is not None:
+        _upload_fingerprints.put(key, digest)
+    return digest
+
+
+def ingest_upload(source, columns=None, progress=None, chunksize=STREAM_CHUNK_SIZE,
+                  max_rows=UPLOAD_MAX_ROWS, max_bytes=UPLOAD_MAX_BYTES):
+    """
+    Load an uploaded CSV into the same dtypes and caches as load_dataset. The
+    header and size are checked before parsing, so a bad file fails fast with an
+    UploadError, and rows are parsed in chunks with progress reporting.
+    An upload that was ingested before is served from the caches without parsing.
+    """
+    size = validate_upload(source, max_bytes)
+    df = cached_dataset(
+        upload_fingerprint(source),
+        lambda cols: select_columns(parse_upload(source, size, chunksize, max_rows, progress), cols),
+        columns,
+        # Uploads stay in this process; they are not written to the persistent shared store
+        shared=False
+    )
+    # A cached upload skips parsing, and with it the row check
+    if len(df) > max_rows:
+        raise UploadError(f"The file has more than {max_rows:,} rows, the upload limit.")
+    return df
@@ -0,0 +1,74 @@
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+class SectionTimer:
+    """
+    Wall time, rows processed and figure payload per dashboard section for one run.
+    Sections are laps: starting a section closes the previous one, so a section
+    covers everything up to the next call to section() or finish().
+    Known figure payload sizes are always recorded; figures without one are only
+    serialized to measure them when `measure_figures` is set.
+    """
+
+    def __init__(self, measure_figures=False):
+        self.measure_figures = measure_figures
+        self.run_id = uuid.uuid4().hex
+        self.timestamp = datetime.now(timezone.utc).isoformat()
+        self.records = []
+        self._current = None
+        self._started = None
+        self._run_started = time.perf_counter()
+
+    def section(self, name, rows=None):
+        """Close the running section and start timing `name`"""
+        self._close()
+        self._current = {'section': name, 'rows': rows, 'figures': 0, 'figure_bytes': 0}
+        self._started = time.perf_counter()
+
+    def set_rows(self, rows):
+        """Record the rows processed by the running section once they are known"""
+        if self._current is not None:
+            self._current['rows'] = rows
+
+    def add_figure(self, fig, payload_bytes=None):
+        """
+        Count a figure shown by the running section, with its JSON size.
+        Pass `payload_bytes` when the serialized size is already known.
+        """
+        if self._current is None:
+            return
+        self._current['figures'] += 1
+        if payload_bytes is None and self.measure_figures:
+            payload_bytes = len(fig.to_json().encode())
+        self._current['figure_bytes'] += payload_bytes or 0
+
+    def _close(self):
+        if self._current is not None:
+            self._current['seconds'] = time.perf_counter() - self._started
+            self.records.append(self._current)
+            self._current = None
+
+    def finish(self):
+        """Close the last section and add a total for the whole run"""
+        self._close()
+        self.records.append({
+            'section': 'Total',
+            'rows': None,
+            'figures': sum(r['figures'] for r in self.records),
+            'figure_bytes': sum(r['figure_bytes'] for r in self.records),
+            'seconds': time.perf_counter() - self._run_started
+        })
+        return self.records
+
+    def to_json_lines(self):
+        """Serialize the records as JSON lines tagged with the run id and start time"""
+        return ''.join(json.dumps({'run_id': self.run_id, 'timestamp': self.timestamp, **record}) + '\n'
+                       for record in self.records)
+
+    def export(self, path):
+        """Append the records to a JSON lines file"""
+        with open(path, 'a') as handle:
+            handle.write(self.to_json_lines())
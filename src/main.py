@@ -1,24 +1,30 @@
 from stress_analysis import *
+from streaming import partitioned_report
+from incremental import APPEND_MODES, refresh_report
+from config import APPEND_MODE, DEFAULT_DATASET_PATH, REPORT_DPI, REPORT_FORMATS, REPORT_OUTPUT_DIR, STREAM_CHUNK_SIZE
+from data_loader import expand_sources
+import argparse
 import os
 
-def main():
-    # Create outputs directory if it doesn't exist
-    if not os.path.exists('outputs'):
-        os.makedirs('outputs')
-
-    # Load data
-    df = load_data('/Users/tanishq/Downloads/corporate_stress_dataset.csv')
+def parse_args():
+    parser = argparse.ArgumentParser(description='Corporate stress batch report')
+    parser.add_argument('source', nargs='?', default=DEFAULT_DATASET_PATH,
+                        help='dataset CSV, a directory of CSV partitions or a glob pattern')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='stream each CSV in chunks of this many rows instead of loading it whole')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes for partitions and plots (default: one per core)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='keep the report aggregates next to the CSV and only read rows appended since the last run')
+    parser.add_argument('--append-by', choices=APPEND_MODES, default=APPEND_MODE,
+                        help='how --incremental finds appended rows: byte offset, row count or key column '
+                             '(default: %s)' % APPEND_MODE)
+    parser.add_argument('--format', dest='formats', action='append', choices=['png', 'svg', 'pdf'],
+                        help='plot file format, may be repeated (default: %s)' % ', '.join(REPORT_FORMATS))
+    parser.add_argument('--dpi', type=int, default=REPORT_DPI, help='plot resolution for raster formats')
+    return parser.parse_args()
 
-    # Generate plots
-    plot_stress_distribution(df)
-    plot_department_stress(df)
-    plot_hours_stress(df)
-
-    # Calculate metrics
-    metrics = calculate_stress_metrics(df)
-    correlations = analyze_correlations(df)
-
-    # Print results
+def print_findings(metrics, correlations):
     print("\nKey Findings:")
     print(f"\nOverall Average Stress Level: {metrics['Overall']:.2f}")
     print("\nAverage Stress Level by Gender:")
@@ -30,5 +36,44 @@ def main():
     print("\nCorrelations with Stress Level:")
     print(correlations)
 
+def main():
+    args = parse_args()
+    paths = expand_sources(args.source)
+
+    formats = args.formats or REPORT_FORMATS
+
+    # Create outputs directory if it doesn't exist
+    if not os.path.exists(REPORT_OUTPUT_DIR):
+        os.makedirs(REPORT_OUTPUT_DIR)
+
+    if args.incremental and len(paths) == 1:
+        # Only rows appended since the saved state are parsed and folded in
+        report, added = refresh_report(paths[0], args.append_by, chunksize=args.chunksize or STREAM_CHUNK_SIZE)
+        print(f"Folded in {added:,} new rows")
+        render_report_plots(report.plot_inputs(), args.workers, formats, args.dpi)
+        print_findings(report.metrics(), report.correlations_with_stress())
+        return
+
+    if len(paths) > 1 or args.chunksize:
+        # Partitions are pre-aggregated in parallel and chunked reads keep memory
+        # bounded; either way only mergeable summaries are combined
+        report = partitioned_report(paths, args.workers, args.chunksize)
+        render_report_plots(report.plot_inputs(), args.workers, formats, args.dpi)
+        print_findings(report.metrics(), report.correlations_with_stress())
+        return
+
+    # Load data
+    df = load_data(paths[0])
+
+    # Generate plots in parallel from small summaries of the frame
+    render_report_plots(report_plot_inputs(df), args.workers, formats, args.dpi)
+
+    # Calculate metrics
+    metrics = calculate_stress_metrics(df)
+    correlations = analyze_correlations(df)
+
+    # Print results
+    print_findings(metrics, correlations)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
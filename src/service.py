@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+from config import DEFAULT_DATASET_PATH, SERVICE_CACHE_SIZE, SERVICE_HOST, SERVICE_PORT
+from data_loader import dataset_memo, expand_sources, source_fingerprint
+from filter_index import FilterIndex
+from stress_analysis import analyze_correlations, analyze_workplace_dynamics, calculate_stress_metrics, load_data
+
+
+def workplace_dynamics(df):
+    """analyze_workplace_dynamics keyed by the grouping of each table"""
+    remote_stats, dept_stats = analyze_workplace_dynamics(df)
+    return {'Remote_Work': remote_stats, 'Department': dept_stats}
+
+
+# Metrics served under /metrics/<name>
+SERVICE_METRICS = {
+    'stress': calculate_stress_metrics,
+    'correlations': analyze_correlations,
+    'workplace': workplace_dynamics
+}
+
+
+def json_ready(value):
+    """
+    Convert analysis results into JSON values: frames become {row: {column: value}}
+    (nested per level of MultiIndex columns), series become objects, and NaN or
+    an infinite (open) bound becomes null.
+    """
+    if isinstance(value, dict):
+        return {str(key): json_ready(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_ready(item) for item in value]
+    if isinstance(value, pd.DataFrame):
+        # Rows as object series, so integer columns are not upcast to float
+        return {str(label): json_ready(pd.Series(list(row), index=value.columns, dtype=object))
+                for label, row in zip(value.index, value.itertuples(index=False))}
+    if isinstance(value, pd.Series):
+        if isinstance(value.index, pd.MultiIndex):
+            return {str(key): json_ready(value[key]) for key in value.index.unique(level=0)}
+        return {str(key): json_ready(item) for key, item in value.items()}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def _query_values(query, name):
+    """Values of a repeatable, comma-separated query parameter, sorted for stable cache keys"""
+    values = [value.strip() for item in query.get(name, []) for value in item.split(',')]
+    return tuple(sorted(value for value in values if value))
+
+
+def _query_int(query, name):
+    values = query.get(name)
+    if not values:
+        return None
+    try:
+        return int(values[-1])
+    except ValueError:
+        raise ValueError(f'{name} must be an integer, got {values[-1]!r}')
+
+
+def parse_filters(query):
+    """
+    Filter state of a request as (departments, genders, experience range):
+    `department` and `gender` may be repeated or comma-separated, and
+    `experience_min`/`experience_max` bound Experience_Years inclusively.
+    """
+    low, high = _query_int(query, 'experience_min'), _query_int(query, 'experience_max')
+    experience = None
+    if low is not None or high is not None:
+        experience = (-np.inf if low is None else low, np.inf if high is None else high)
+    return _query_values(query, 'department'), _query_values(query, 'gender'), experience
+
+
+class MetricsService:
+    """
+    Serves the analysis metrics of named datasets as JSON. Each dataset is
+    loaded once per version of its files and every response body is kept in an
+    LRU cache keyed by (dataset, file fingerprints, metric, filter state), so
+    files that are appended to or replaced are reloaded on the next request.
+    Identical requests arriving while a result is being computed wait for that
+    computation instead of repeating it.
+    """
+
+    def __init__(self, datasets, cache_size=SERVICE_CACHE_SIZE):
+        self.datasets = dict(datasets)
+        self.results = LRUCache(cache_size)
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0}
+        self._frames = {}
+        self._pending = {}
+
+    async def _once(self, key, compute):
+        """Run compute() in a worker thread; concurrent calls with the same key share one run"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().run_in_executor(None, compute)
+        self._pending[key] = future
+        try:
+            # Shielded so a disconnecting client does not cancel the shared run
+            return await asyncio.shield(future)
+        finally:
+            self._pending.pop(key, None)
+
+    def fingerprint(self, name):
+        """Content hashes of a dataset's files; only files whose size or mtime changed are rehashed"""
+        if name not in self.datasets:
+            raise KeyError(f'unknown dataset {name!r}')
+        return tuple(source_fingerprint(path) for path in expand_sources(self.datasets[name]))
+
+    async def frame(self, name, fingerprint=None):
+        """Return a named dataset, loading it on first use and again whenever its files change"""
+        if fingerprint is None:
+            fingerprint = self.fingerprint(name)
+        loaded = self._frames.get(name)
+        if loaded is None or loaded[0] != fingerprint:
+            df = await self._once(('dataset', name, fingerprint), lambda: load_data(self.datasets[name]))
+            self._frames[name] = loaded = (fingerprint, df)
+        return loaded[1]
+
+    async def metric(self, metric, name, filters):
+        """Return the JSON body for one metric of a dataset under a filter state"""
+        if metric not in SERVICE_METRICS:
+            raise KeyError(f'unknown metric {metric!r}')
+        fingerprint = self.fingerprint(name)
+        key = (name, fingerprint, metric, filters)
+        body = self.results.get(key)
+        if body is not None:
+            self.stats['hits'] += 1
+            return body
+        df = await self.frame(name, fingerprint)
+        body = await self._once(key, lambda: self._compute(df, name, metric, filters))
+        return self.results.put(key, body)
+
+    def _compute(self, df, name, metric, filters):
+        self.stats['misses'] += 1
+        departments, genders, experience = filters
+        if departments or genders or experience is not None:
+            index = dataset_memo(df, 'filter_index', FilterIndex)
+            df = index.select({'Department': departments, 'Gender': genders}, experience).frame()
+        return json.dumps({
+            'dataset': name,
+            'metric': metric,
+            'filters': json_ready({'department': list(departments), 'gender': list(genders),
+                                   'experience': experience}),
+            'rows': len(df),
+            'result': json_ready(SERVICE_METRICS[metric](df))
+        }, allow_nan=False).encode()
+
+    def health(self):
+        return json.dumps({
+            'status': 'ok',
+            'datasets': sorted(self.datasets),
+            'loaded': sorted(self._frames),
+            'cached_results': len(self.results),
+            **self.stats
+        }).encode()
+
+    async def respond(self, request_line):
+        """Route one request line to (status, JSON body)"""
+        try:
+            method, target, _ = request_line.decode('latin-1').split()
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, _error('malformed request line')
+        if method != 'GET':
+            return HTTPStatus.METHOD_NOT_ALLOWED, _error(f'{method} is not supported')
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = url.path.strip('/').split('/')
+        if parts == ['health']:
+            return HTTPStatus.OK, self.health()
+        if len(parts) != 2 or parts[0] != 'metrics':
+            return HTTPStatus.NOT_FOUND, _error(f'no route for {url.path}')
+        metric, name = parts[1], query.get('dataset', ['default'])[-1]
+        if metric not in SERVICE_METRICS:
+            return HTTPStatus.NOT_FOUND, _error(f'unknown metric {metric!r}')
+        if name not in self.datasets:
+            return HTTPStatus.NOT_FOUND, _error(f'unknown dataset {name!r}')
+        try:
+            filters = parse_filters(query)
+        except ValueError as error:
+            return HTTPStatus.BAD_REQUEST, _error(str(error))
+        return HTTPStatus.OK, await self.metric(metric, name, filters)
+
+    async def handle(self, reader, writer):
+        """asyncio stream handler: one request per connection"""
+        try:
+            request_line = await reader.readline()
+            # Headers are not used; read up to the blank line that ends them
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            try:
+                status, body = await self.respond(request_line)
+            except Exception as error:
+                status, body = HTTPStatus.INTERNAL_SERVER_ERROR, _error(f'{type(error).__name__}: {error}')
+            writer.write(f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+                         f'Content-Type: application/json\r\n'
+                         f'Content-Length: {len(body)}\r\n'
+                         f'Connection: close\r\n\r\n'.encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _error(message):
+    return json.dumps({'error': message}).encode()
+
+
+async def serve(service, host=SERVICE_HOST, port=SERVICE_PORT, preload=False):
+    """Run the service until cancelled"""
+    if preload:
+        for name in service.datasets:
+            await service.frame(name)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving {', '.join(sorted(service.datasets))} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def parse_datasets(specs):
+    """Parse NAME=PATH dataset arguments; a bare path is the 'default' dataset"""
+    datasets = {}
+    for spec in specs:
+        name, sep, path = spec.partition('=')
+        if not sep:
+            name, path = 'default', spec
+        datasets[name] = path
+    return datasets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local HTTP service for the stress analysis metrics')
+    parser.add_argument('--host', default=SERVICE_HOST, help='interface to listen on')
+    parser.add_argument('--port', type=int, default=SERVICE_PORT, help='port to listen on')
+    parser.add_argument('--dataset', action='append', default=[],
+                        help='NAME=PATH of a dataset file, directory or glob; may be repeated '
+                             '(default: the bundled dataset as "default")')
+    parser.add_argument('--cache-size', type=int, default=SERVICE_CACHE_SIZE, help='cached responses')
+    parser.add_argument('--preload', action='store_true', help='load every dataset before listening')
+    args = parser.parse_args()
+
+    datasets = parse_datasets(args.dataset) or {'default': DEFAULT_DATASET_PATH}
+    service = MetricsService(datasets, args.cache_size)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.preload))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from aggregation import factorize_key
+from caching import LRUCache
+from config import (BOOTSTRAP_BATCH_ELEMENTS, BOOTSTRAP_MAX_DISTINCT, SIGNIFICANCE_CACHE_SIZE,
+                    SIGNIFICANCE_CONFIDENCE, SIGNIFICANCE_RESAMPLES, SIGNIFICANCE_SEED)
+
+# Dashboard group comparisons tested for significance, as (group columns, metric)
+COMPARISONS = {
+    'department_stress': (['Department'], 'Stress_Level'),
+    'remote_stress': (['Remote_Work'], 'Stress_Level'),
+    'gender_department_stress': (['Gender', 'Department'], 'Stress_Level')
+}
+
+# Comparison results keyed by (filter state, comparison)
+_significance_cache = LRUCache(SIGNIFICANCE_CACHE_SIZE)
+
+
+def _test_row(name, statistic, df1, df2):
+    valid = np.isfinite(statistic) and df1 > 0 and df2 > 0
+    return {'test': name, 'statistic': statistic if valid else np.nan, 'df1': df1, 'df2': df2,
+            'p_value': stats.f.sf(statistic, df1, df2) if valid else np.nan}
+
+
+def oneway_anova(count, mean, var):
+    """Classic one-way ANOVA F test from group counts, means and variances"""
+    keep = count > 0
+    count, mean, var = count[keep], mean[keep], var[keep]
+    k, n = len(count), count.sum()
+    if k < 2 or n <= k:
+        return _test_row('ANOVA', np.nan, max(k - 1, 0), n - k)
+    grand = (count * mean).sum() / n
+    between = (count * (mean - grand) ** 2).sum() / (k - 1)
+    within = np.where(count > 1, (count - 1) * var, 0.0).sum() / (n - k)
+    return _test_row('ANOVA', between / within if within > 0 else np.nan, k - 1, n - k)
+
+
+def welch_anova(count, mean, var):
+    """Welch's one-way ANOVA, which does not assume equal group variances"""
+    keep = count > 1
+    count, mean, var = count[keep], mean[keep], var[keep]
+    k = len(count)
+    if k < 2 or not (var > 0).all():
+        return _test_row('Welch ANOVA', np.nan, max(k - 1, 0), np.nan)
+    weights = count / var
+    total = weights.sum()
+    weighted_mean = (weights * mean).sum() / total
+    spread = (weights * (mean - weighted_mean) ** 2).sum() / (k - 1)
+    tail = ((1 - weights / total) ** 2 / (count - 1)).sum()
+    statistic = spread / (1 + 2 * (k - 2) / (k * k - 1) * tail)
+    return _test_row('Welch ANOVA', statistic, k - 1, (k * k - 1) / (3 * tail))
+
+
+def _dummies(codes):
+    """Treatment-coded indicator columns of a factor (first level dropped)"""
+    return (codes[:, None] == np.unique(codes)[None, 1:]).astype('float64')
+
+
+def factorial_anova(index, count, mean, var):
+    """
+    Two-way ANOVA with interaction from the counts, means and variances of the
+    factor cells, with type II sums of squares like statsmodels' anova_lm(typ=2).
+    A model's residual sum of squares is the within-cell sum of squares plus the
+    count-weighted misfit of the cell means, so every fit is a small least-squares
+    problem over cells rather than rows.
+    """
+    keep = count > 0
+    count, mean, var = count[keep], mean[keep], var[keep]
+    a, b = (np.asarray(codes)[keep] for codes in index.codes)
+    n, n_cells = count.sum(), len(count)
+    within = np.where(count > 1, (count - 1) * var, 0.0).sum()
+    df_resid = n - n_cells
+    weight = np.sqrt(count)
+
+    def fit(*factors):
+        design = np.column_stack([np.ones(n_cells)] + [_dummies(codes) for codes in factors])
+        coef, _, rank, _ = np.linalg.lstsq(design * weight[:, None], mean * weight, rcond=None)
+        return within + (count * (mean - design @ coef) ** 2).sum(), rank
+
+    rss_a, rank_a = fit(a)
+    rss_b, rank_b = fit(b)
+    rss_ab, rank_ab = fit(a, b)
+    mse = within / df_resid if df_resid > 0 and within > 0 else np.nan
+    terms = [(index.names[0], rss_b - rss_ab, rank_ab - rank_b),
+             (index.names[1], rss_a - rss_ab, rank_ab - rank_a),
+             (' × '.join(index.names), rss_ab - within, n_cells - rank_ab)]
+    return [_test_row(name, max(ss, 0.0) / df / mse if df > 0 else np.nan, df, df_resid)
+            for name, ss, df in terms]
+
+
+def group_moments(codes, n_groups, values):
+    """Count, mean and sample variance of the non-missing values of every group"""
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    count = np.bincount(codes, minlength=n_groups).astype('float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=n_groups) / count
+        squares = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=n_groups)
+        var = np.where(count > 1, squares / (count - 1), np.nan)
+    return count, mean, var
+
+
+def _value_levels(values):
+    """Distinct values and the level of each value; integers in a short range skip the sort"""
+    if len(values):
+        low, high = values.min(), values.max()
+        if high - low < BOOTSTRAP_MAX_DISTINCT and np.array_equal(values, np.floor(values)):
+            return np.arange(low, high + 1), (values - low).astype(np.int64)
+    return np.unique(values, return_inverse=True)
+
+
+def bootstrap_means(codes, n_groups, values, resamples=SIGNIFICANCE_RESAMPLES, seed=SIGNIFICANCE_SEED):
+    """
+    Bootstrap distribution of every group mean, as a (resamples, groups) array.
+    Groups are resampled separately (a stratified bootstrap). When the values take
+    few distinct levels, resampling a group's rows is one multinomial draw over its
+    value counts, so all groups and a whole batch of resamples are drawn in one
+    call whose cost does not depend on the number of rows; otherwise row
+    positions are drawn in batches of about BOOTSTRAP_BATCH_ELEMENTS.
+    """
+    rng = np.random.default_rng(seed)
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    sizes = np.bincount(codes, minlength=n_groups)
+    present = np.flatnonzero(sizes)
+    means = np.full((resamples, n_groups), np.nan)
+    if not len(present):
+        return means
+
+    levels, level_codes = _value_levels(values)
+    if len(levels) <= BOOTSTRAP_MAX_DISTINCT:
+        counts = np.bincount(codes * len(levels) + level_codes, minlength=n_groups * len(levels))
+        counts = counts.reshape(n_groups, len(levels))[present]
+        n = sizes[present]
+        shares = counts / n[:, None]
+        batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // counts.size)
+        for start in range(0, resamples, batch):
+            stop = min(start + batch, resamples)
+            draws = rng.multinomial(n, shares, size=(stop - start, len(n)))
+            means[start:stop, present] = draws @ levels / n
+        return means
+
+    order = np.argsort(codes, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    for group in present:
+        group_values = values[order[bounds[group]:bounds[group + 1]]]
+        batch = max(1, BOOTSTRAP_BATCH_ELEMENTS // len(group_values))
+        for start in range(0, resamples, batch):
+            stop = min(start + batch, resamples)
+            rows = rng.integers(0, len(group_values), size=(stop - start, len(group_values)))
+            means[start:stop, group] = group_values[rows].mean(axis=1)
+    return means
+
+
+def compare_groups(df, groups, metric, resamples=SIGNIFICANCE_RESAMPLES, confidence=SIGNIFICANCE_CONFIDENCE,
+                   seed=SIGNIFICANCE_SEED):
+    """
+    Test whether `metric` differs between the groups of one or two columns.
+    Returns {'tests': ANOVA and Welch F tests (plus main effects and interaction
+    for two columns), 'groups': per-group count and mean with bootstrap percentile
+    intervals for the mean and for its difference from all other groups}.
+    The difference intervals, and the 'significant' flag set when one excludes
+    zero, are Bonferroni-adjusted across the groups of the comparison, so the
+    chance of any group being flagged by chance stays within 1 - confidence.
+    """
+    codes, n_groups, index = factorize_key(df, groups[0] if len(groups) == 1 else tuple(groups))
+    values = df[metric].to_numpy(dtype='float64')
+    count, mean, var = group_moments(codes, n_groups, values)
+
+    tests = [oneway_anova(count, mean, var), welch_anova(count, mean, var)]
+    if len(groups) == 2:
+        tests += factorial_anova(index, count, mean, var)
+
+    boot = bootstrap_means(codes, n_groups, values, resamples, seed)
+    # Mean of all other groups in each resample, from the resampled group sums
+    sums = np.where(count > 0, boot * count, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        others = (sums.sum(axis=1, keepdims=True) - sums) / (count.sum() - count)
+        observed = mean - (np.nansum(mean * count) - np.where(count > 0, mean * count, 0.0)) / (count.sum() - count)
+    tail = (1 - confidence) / 2
+    mean_low, mean_high = np.quantile(boot, [tail, 1 - tail], axis=0)
+    # One test per group present, so each difference interval is taken at 1 - alpha / groups
+    adjusted_tail = tail / max(int((count > 0).sum()), 1)
+    diff_low, diff_high = np.quantile(boot - others, [adjusted_tail, 1 - adjusted_tail], axis=0)
+
+    group_table = pd.DataFrame({
+        'count': count.astype(np.int64),
+        'mean': mean,
+        'ci_low': mean_low,
+        'ci_high': mean_high,
+        'diff': observed,
+        'diff_low': diff_low,
+        'diff_high': diff_high,
+        'significant': (diff_low > 0) | (diff_high < 0)
+    }, index=index)
+    return {'tests': pd.DataFrame(tests).set_index('test'), 'groups': group_table}
+
+
+def significance_results(name, view):
+    """
+    compare_groups for a dashboard comparison over a view's rows, cached by
+    (filter state, comparison). Views without a state are always recomputed.
+    """
+    groups, metric = COMPARISONS[name]
+    compute = lambda: compare_groups(view.frame, groups, metric)
+    if view.state is None or view.state[0] is None:
+        return compute()
+    return _significance_cache.get_or_compute((view.state, name), compute)
+
+
+def significance_summary(result, confidence=SIGNIFICANCE_CONFIDENCE):
+    """One line naming each test's p-value and whether it is significant"""
+    alpha = 1 - confidence
+    parts = []
+    for test, row in result['tests'].iterrows():
+        if np.isnan(row['p_value']):
+            parts.append(f"{test}: n/a")
+        else:
+            verdict = 'significant' if row['p_value'] < alpha else 'not significant'
+            parts.append(f"{test}: p = {row['p_value']:.3g} ({verdict})")
+    return f"Significance at the {alpha:.0%} level — " + '; '.join(parts)
+
+
+def clear_significance_cache():
+    """Drop all cached comparison results"""
+    _significance_cache.clear()
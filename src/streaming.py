@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from aggregation import CorrelationAccumulator, MomentAccumulator, plain_label, spec_requests
+from config import HOURS_SAMPLE_SIZE, NUMERIC_COLUMNS, STREAM_CHUNK_SIZE
+from data_loader import load_dataset, read_csv_chunks
+from stress_analysis import (STRESS_METRIC_REQUESTS, WORKPLACE_DYNAMICS_SPECS, analyze_correlations,
+                             analyze_workplace_dynamics, calculate_stress_metrics)
+
+# Columns the batch report reads from each chunk
+REPORT_COLUMNS = NUMERIC_COLUMNS + ['Gender', 'Department', 'Remote_Work']
+
+SAMPLE_COLUMNS = ['Working_Hours_per_Week', 'Stress_Level']
+
+
+def report_requests():
+    """Aggregation requests behind the metrics and workplace dynamics of the report"""
+    requests = list(STRESS_METRIC_REQUESTS.values())
+    for key, spec in WORKPLACE_DYNAMICS_SPECS.items():
+        requests += spec_requests(key, spec)
+    return requests
+
+
+class ReportAccumulator:
+    """
+    Everything the batch report needs, folded in one chunk at a time: group moments
+    for the metrics, correlation sums, Stress_Level counts per department and a
+    uniform sample of rows for the hours scatter. Memory does not grow with the
+    number of rows, and accumulators built over separate chunks or files merge.
+    """
+
+    def __init__(self, sample_size=HOURS_SAMPLE_SIZE, seed=0):
+        self.moments = MomentAccumulator(report_requests())
+        self.correlations = CorrelationAccumulator(NUMERIC_COLUMNS)
+        self.stress_counts = None
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(seed)
+        self.sample_keys = np.empty(0)
+        self.sample = pd.DataFrame(columns=SAMPLE_COLUMNS)
+
+    def update(self, chunk):
+        """Fold one chunk of rows into the report"""
+        self.moments.update(chunk)
+        self.correlations.update(chunk)
+        counts = chunk.groupby(['Department', 'Stress_Level'], dropna=False).size()
+        self._add_counts(counts)
+        # Reservoir sample: keep the rows with the smallest uniform random keys
+        self._add_sample(self.rng.random(len(chunk)), chunk[SAMPLE_COLUMNS])
+        return self
+
+    def _add_counts(self, counts):
+        if self.stress_counts is None:
+            self.stress_counts = counts
+        else:
+            self.stress_counts = self.stress_counts.add(counts, fill_value=0)
+
+    def _add_sample(self, keys, rows):
+        keys = np.concatenate([self.sample_keys, keys])
+        rows = pd.concat([self.sample, rows], ignore_index=True) if len(self.sample) else rows
+        keep = np.argsort(keys, kind='stable')[:self.sample_size]
+        self.sample_keys = keys[keep]
+        self.sample = rows.iloc[keep].reset_index(drop=True)
+
+    def merge(self, other):
+        """Add a report accumulated over other rows into this one"""
+        self.moments.merge(other.moments)
+        self.correlations.merge(other.correlations)
+        if other.stress_counts is not None:
+            self._add_counts(other.stress_counts)
+        self._add_sample(other.sample_keys, other.sample)
+        return self
+
+    def state(self):
+        """Plain (JSON-ready) form of the report, restored by from_state()"""
+        counts = self.stress_counts
+        return {
+            'moments': self.moments.state(),
+            'correlations': self.correlations.state(),
+            'stress_counts': None if counts is None else [plain_label(label) + [float(count)]
+                                                          for label, count in counts.items()],
+            'sample_size': self.sample_size,
+            'rng': self.rng.bit_generator.state,
+            'sample_keys': self.sample_keys.tolist(),
+            'sample': {col: [plain_label(value) for value in self.sample[col]] for col in SAMPLE_COLUMNS}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a report from state()"""
+        report = cls(state['sample_size'])
+        report.moments = MomentAccumulator.from_state(state['moments'])
+        report.correlations = CorrelationAccumulator.from_state(state['correlations'])
+        if state['stress_counts'] is not None:
+            index = pd.MultiIndex.from_tuples([tuple(row[:2]) for row in state['stress_counts']],
+                                              names=['Department', 'Stress_Level'])
+            report.stress_counts = pd.Series([row[2] for row in state['stress_counts']], index=index,
+                                             dtype='float64')
+        report.rng.bit_generator.state = state['rng']
+        report.sample_keys = np.array(state['sample_keys'], dtype='float64')
+        report.sample = pd.DataFrame(state['sample'], columns=SAMPLE_COLUMNS)
+        return report
+
+    def metrics(self):
+        """Same result as calculate_stress_metrics on the full dataset"""
+        return calculate_stress_metrics(None, self.moments.results())
+
+    def correlations_with_stress(self):
+        """Same result as analyze_correlations on the full dataset"""
+        return analyze_correlations(None, self.correlations)
+
+    def workplace_dynamics(self):
+        """Same result as analyze_workplace_dynamics on the full dataset"""
+        return analyze_workplace_dynamics(None, self.moments.results())
+
+    def plot_inputs(self):
+        """Summaries for render_report_plots, as report_plot_inputs gives for a frame"""
+        by_department = self.stress_counts[self.stress_counts.index.get_level_values(0).notna()
+                                           & self.stress_counts.index.get_level_values(1).notna()]
+        return {
+            'stress_distribution': self.stress_counts.groupby(level=1).sum(),
+            'department_stress': by_department,
+            'hours_stress': self.sample.dropna()
+        }
+
+
+def stream_report(source, chunksize=STREAM_CHUNK_SIZE, seed=0):
+    """Accumulate the batch report over a CSV read in chunks of `chunksize` rows"""
+    report = ReportAccumulator(seed=seed)
+    for chunk in read_csv_chunks(source, chunksize, REPORT_COLUMNS):
+        report.update(chunk)
+    return report
+
+
+def summarize_partition(path, chunksize=None, seed=0):
+    """Pre-aggregate one partition file, whole or in chunks; runs in a worker process"""
+    if chunksize:
+        return stream_report(path, chunksize, seed)
+    return ReportAccumulator(seed=seed).update(load_dataset(path, REPORT_COLUMNS))
+
+
+def partitioned_report(paths, workers=None, chunksize=None):
+    """
+    Summarize every partition in a process pool and merge the partial reports.
+    Only the small accumulators travel between processes, never the rows.
+    Each partition samples with its own seed, so the merged sample stays uniform.
+    """
+    paths = list(paths)
+    if len(paths) == 1:
+        return summarize_partition(paths[0], chunksize)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        partials = pool.map(summarize_partition, paths, [chunksize] * len(paths), range(len(paths)))
+        report = next(partials)
+        for partial in partials:
+            report.merge(partial)
+    return report
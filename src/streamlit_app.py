@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from stress_analysis import *
-import plotly.express as px
-import plotly.graph_objects as go
-from config import CHART_COLORS, CHART_THEME
+from config import DEFAULT_DATASET_PATH, NUMERIC_COLUMNS, PERFORMANCE_LOG_PATH
+from data_loader import dataset_fingerprint, dataset_memo, memory_report
+from ingestion import UploadError, ingest_upload
+from filter_index import FilterIndex
+from cube import CorrelationCube, build_dashboard_cubes
+from features import with_derived_features
+from figures import DataView, figure_from_json, figure_json
+from significance import significance_results, significance_summary
+from instrumentation import SectionTimer
 
 # Page config must be the first Streamlit command
 st.set_page_config(
@@ -14,6 +18,17 @@ st.set_page_config(
     layout="wide"
 )
 
+# Collapsible dashboard sections, in page order
+DASHBOARD_SECTIONS = [
+    'Correlation Analysis',
+    'Working Hours Impact',
+    'Sleep Pattern Analysis',
+    'Health Impact Analysis',
+    'Additional Insights',
+    'Workplace Dynamics',
+    'Workplace Equality Analysis'
+]
+
 # Custom CSS styling
 def local_css():
     st.markdown("""
@@ -109,6 +124,12 @@ def local_css():
             transition: all 0.2s;
         }
         
+        /* Radio-based tab bars */
+        div[role="radiogroup"] {
+            gap: 1rem;
+            margin-bottom: 1rem;
+        }
+        
         .stTabs [aria-selected="true"] {
             background: linear-gradient(135deg, #3b82f6, #1d4ed8);
             color: white;
@@ -138,22 +159,37 @@ def local_css():
         </style>
     """, unsafe_allow_html=True)
 
-# Common chart layout settings
-def get_chart_layout():
-    return {
-        'plot_bgcolor': CHART_THEME['bgcolor'],
-        'paper_bgcolor': CHART_THEME['bgcolor'],
-        'font': {
-            'family': CHART_THEME['font_family'],
-            'color': CHART_THEME['axis_font_color']
-        },
-        'margin': dict(t=30, l=30, r=30, b=30),
-        'legend': {
-            'bgcolor': 'rgba(255,255,255,0.8)',
-            'bordercolor': '#E2E2E2',
-            'borderwidth': 1
-        }
-    }
+def lazy_tabs(labels, key):
+    """
+    Tab bar that only runs the selected tab's code. st.tabs executes every tab
+    body on each rerun, so a horizontal radio stands in for it.
+    """
+    return st.radio(key, labels, horizontal=True, key=key, label_visibility='collapsed')
+
+def show_figure(chart_id, view, perf):
+    """Render a dashboard chart through the figure cache and count it towards the running section"""
+    spec = figure_json(chart_id, view)
+    fig = figure_from_json(spec)
+    st.plotly_chart(fig, use_container_width=True)
+    perf.add_figure(fig, payload_bytes=len(spec.encode()))
+
+def show_significance(name, view):
+    """Significance tests of a chart's group comparison under the current filters"""
+    result = significance_results(name, view)
+    st.caption(significance_summary(result))
+    with st.expander("Tests and bootstrap confidence intervals (group differences Bonferroni-adjusted)"):
+        st.dataframe(result['tests'].round(4), use_container_width=True)
+        st.dataframe(result['groups'].round(3), use_container_width=True)
+
+def render_performance_panel(perf):
+    """Sidebar table of this run's section timings, downloadable as JSON lines"""
+    records = pd.DataFrame(perf.records).set_index('section')
+    records['seconds'] = records['seconds'].round(4)
+    records['figure_kb'] = (records['figure_bytes'] / 1024).round(1)
+    with st.sidebar.expander("Performance", expanded=True):
+        st.dataframe(records[['seconds', 'rows', 'figures', 'figure_kb']])
+        st.download_button("Download as JSON lines", perf.to_json_lines(),
+                           file_name='dashboard_performance.jsonl', mime='application/json')
 
 def render_footer():
     st.markdown("""
@@ -171,6 +207,9 @@ def render_footer():
     """, unsafe_allow_html=True)
 
 def main():
+    # Per-section timings and figure payloads, shown when the panel is ticked
+    perf = SectionTimer()
+    perf.section('Page setup')
     local_css()
 
     # Header with custom HTML
@@ -187,25 +226,44 @@ def main():
     """, unsafe_allow_html=True)
 
     # Allow users to upload their own dataset or use the default
+    perf.section('Load data')
     uploaded_file = st.sidebar.file_uploader("Upload your own dataset", type=['csv'])
+    df = None
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
-    else:
+        # Header and size are validated before parsing; rows are parsed in chunks
+        progress = st.sidebar.progress(0.0)
+        try:
+            df = ingest_upload(uploaded_file,
+                               progress=lambda fraction, rows: progress.progress(
+                                   fraction, text=f"Loaded {rows:,} rows"))
+        except UploadError as error:
+            st.sidebar.error(f"{error} Showing the default dataset instead.")
+        progress.empty()
+    if df is None:
         # Use default dataset
-        df = load_data('/Users/tanishq/Downloads/corporate_stress_dataset.csv')
+        df = load_data(DEFAULT_DATASET_PATH)
+
+    perf.set_rows(len(df))
 
-    # Ensure numeric datatypes for correlation analysis
-    numeric_columns = ['Stress_Level', 'Age', 'Working_Hours_per_Week', 
-                      'Monthly_Salary_INR', 'Sleep_Hours', 'Work_Life_Balance']
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    # Numeric datatypes are enforced by the loader's schema
+    numeric_columns = NUMERIC_COLUMNS
+
+    perf.section('Indexes and cubes', rows=len(df))
+    # Derived columns, the filter index and aggregation cubes are built once per loaded
+    # dataset; filtered views select rows from the derived columns instead of recomputing them
+    featured_df = dataset_memo(df, 'derived_features', with_derived_features)
+    filter_index = dataset_memo(featured_df, 'filter_index', FilterIndex)
+    cubes = dataset_memo(df, 'dashboard_cubes', build_dashboard_cubes)
+    correlation_cube = dataset_memo(df, 'correlation_cube', CorrelationCube)
 
     # Display correlation info in debug mode
     if st.checkbox("Show Data Info", False):
         st.write("Data Types:", df[numeric_columns].dtypes)
-        st.write("Sample Correlations:", df[numeric_columns].corr().round(2))
+        st.write("Sample Correlations:", correlation_cube.accumulator().correlation().round(2))
+        st.write("Memory Usage (bytes):", memory_report(df))
 
     # Sidebar with custom styling
+    perf.section('Sidebar controls')
     with st.sidebar:
         st.markdown("""
             <h2 class='sidebar-title'>Dashboard Controls</h2>
@@ -213,13 +271,13 @@ def main():
         
         department = st.multiselect(
             'Select Department(s)',
-            options=df['Department'].unique(),
+            options=filter_index.options('Department'),
             default=[]
         )
 
         gender = st.multiselect(
             'Select Gender(s)',
-            options=df['Gender'].unique(),
+            options=filter_index.options('Gender'),
             default=[]
         )
 
@@ -230,36 +288,55 @@ def main():
             value=(0, 40)
         )
 
-    # Filter data
-    if not department:
-        department = df['Department'].unique()
-    if not gender:
-        gender = df['Gender'].unique()
-        
-    filtered_df = df[
-        df['Department'].isin(department) & 
-        df['Gender'].isin(gender) &
-        (df['Experience_Years'].between(experience_range[0], experience_range[1]))
-    ]
+        # Hidden sections are skipped entirely on rerun
+        visible_sections = st.multiselect(
+            'Visible Sections',
+            options=DASHBOARD_SECTIONS,
+            default=DASHBOARD_SECTIONS
+        )
+
+        # Section timings, with figure payload sizes, for this run
+        show_performance = st.checkbox('Show Performance', False)
+
+    # Filter data: an empty selection means all values
+    perf.section('Filter')
+    selection = filter_index.select(
+        {'Department': department, 'Gender': gender},
+        value_range=experience_range
+    )
+    # Rows are only copied into a frame when a chart needs them
+    perf.set_rows(len(selection))
+
+    # The same filter state, applied to cube cells instead of rows
+    cube_filters = {'Department': department, 'Gender': gender}
+    cube_ranges = {'Experience_Years': experience_range}
+
+    # Hashable identity of the dataset and filters, for result caches
+    filter_state = (dataset_fingerprint(df), tuple(department), tuple(gender), tuple(experience_range))
+
+    # What the figure builders see of the dataset under these filters
+    view = DataView(selection, cubes, correlation_cube, cube_filters, cube_ranges, filter_state)
 
     # Metrics in cards
+    perf.section('Metric cards', rows=len(selection))
+    stress_levels = pd.Series(selection.column('Stress_Level'))
     st.markdown("<div class='metrics-row'>", unsafe_allow_html=True)
     st.markdown(f"""
         <div class="metric-card">
             <div class="metric-label">Average Stress</div>
-            <div class="metric-value">{filtered_df['Stress_Level'].mean():.1f}</div>
+            <div class="metric-value">{stress_levels.mean():.1f}</div>
         </div>
         <div class="metric-card">
             <div class="metric-label">Median Stress</div>
-            <div class="metric-value">{filtered_df['Stress_Level'].median():.1f}</div>
+            <div class="metric-value">{stress_levels.median():.1f}</div>
         </div>
         <div class="metric-card">
             <div class="metric-label">High Stress Cases</div>
-            <div class="metric-value">{(filtered_df['Stress_Level'] > 7).sum():,}</div>
+            <div class="metric-value">{(stress_levels > 7).sum():,}</div>
         </div>
         <div class="metric-card">
             <div class="metric-label">Total Employees</div>
-            <div class="metric-value">{len(filtered_df):,}</div>
+            <div class="metric-value">{len(selection):,}</div>
         </div>
     """, unsafe_allow_html=True)
     st.markdown("</div>", unsafe_allow_html=True)
@@ -308,724 +385,294 @@ def main():
     """, unsafe_allow_html=True)
 
     # Main visualizations with tighter spacing
+    perf.section('Distribution charts', rows=len(selection))
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
         st.subheader("📊 Stress Level Distribution")
-        fig = px.histogram(filtered_df, x='Stress_Level', 
-                          nbins=11,
-                          color_discrete_sequence=[CHART_COLORS[0]],
-                          opacity=0.8,
-                          title="")
-        fig.update_layout(
-            **get_chart_layout(),
-            bargap=0.1,
-            height=400
-        )
-        fig.update_traces(
-            marker_line_color='white',
-            marker_line_width=1
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('stress_distribution', view, perf)
         st.markdown("</div>", unsafe_allow_html=True)
 
     with col2:
         st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
         st.subheader("📈 Department-wise Stress Levels")
-        fig = px.box(filtered_df, x='Department', y='Stress_Level',
-                     color='Department',
-                     color_discrete_sequence=CHART_COLORS,
-                     title="")
-        fig.update_layout(
-            **get_chart_layout(),
-            xaxis={'tickangle': 45},
-            boxmode='group',
-            showlegend=False,
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        show_figure('department_stress', view, perf)
+        show_significance('department_stress', view)
         st.markdown("</div>", unsafe_allow_html=True)
 
     # Correlation heatmap
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("🔍 Correlation Analysis")
-    corr_cols = ['Stress_Level', 'Age', 'Working_Hours_per_Week', 
-                 'Monthly_Salary_INR', 'Sleep_Hours', 'Work_Life_Balance']
-    # Round correlations to 2 decimal places during calculation
-    corr_matrix = filtered_df[corr_cols].corr().round(2)
-    # Add correlation annotations
-    annotations = []
-    for i, row in enumerate(corr_matrix.values):
-        for j, value in enumerate(row):
-            annotations.append(
-                dict(
-                    x=corr_cols[j],
-                    y=corr_cols[i],
-                    text=f"{value:.2f}",
-                    font=dict(size=12),
-                    showarrow=False
-                )
-            )
-    fig = go.Figure(data=go.Heatmap(
-        z=corr_matrix,
-        x=corr_cols,
-        y=corr_cols,
-        hoverongaps=False,
-        colorscale=[
-            [0.0, '#d73027'],      # Strong negative correlation (red)
-            [0.25, '#f46d43'],     # Moderate negative correlation
-            [0.5, '#ffffff'],      # No correlation (white)
-            [0.75, '#74add1'],     # Moderate positive correlation
-            [1.0, '#4575b4']       # Strong positive correlation (blue)
-        ],
-        zmid=0,
-        zmin=-1,
-        zmax=1
-    ))
-    fig.update_layout(
-        **get_chart_layout(),
-        height=500,
-        xaxis={'tickangle': 45},
-        yaxis={'tickangle': 0},
-        annotations=annotations,
-        coloraxis_colorbar=dict(
-            title="Correlation",
-            titleside="right",
-            thickness=15,
-            len=0.7,
-            tickmode="array",
-            ticktext=["-1", "-0.5", "0", "0.5", "1"],
-            tickvals=[-1, -0.5, 0, 0.5, 1],
-            ticks="outside"
-        )
-    )
-    # Add a note about correlation interpretation
-    st.markdown("""
-        <div style='margin-top: 1rem; padding: 1rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
-            <p style='margin: 0; color: #64748b; font-size: 0.9rem;'>
-            <strong>Note:</strong> Correlation values range from -1 to 1:
-            <ul style='margin: 0.5rem 0;'>
-                <li>1.0: Perfect positive correlation</li>
-                <li>0.0: No correlation</li>
-                <li>-1.0: Perfect negative correlation</li>
-            </ul>
-            The current data shows very weak correlations between most variables.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-    st.plotly_chart(fig, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+    if 'Correlation Analysis' in visible_sections:
+        perf.section('Correlation Analysis', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("🔍 Correlation Analysis")
+        # Add a note about correlation interpretation
+        st.markdown("""
+            <div style='margin-top: 1rem; padding: 1rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
+                <p style='margin: 0; color: #64748b; font-size: 0.9rem;'>
+                <strong>Note:</strong> Correlation values range from -1 to 1:
+                <ul style='margin: 0.5rem 0;'>
+                    <li>1.0: Perfect positive correlation</li>
+                    <li>0.0: No correlation</li>
+                    <li>-1.0: Perfect negative correlation</li>
+                </ul>
+                The current data shows very weak correlations between most variables.
+                </p>
+            </div>
+        """, unsafe_allow_html=True)
+        show_figure('correlation_heatmap', view, perf)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Working Hours Analysis
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("⏰ Working Hours Impact")
-    col1, col2 = st.columns(2)
+    if 'Working Hours Impact' in visible_sections:
+        perf.section('Working Hours Impact', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("⏰ Working Hours Impact")
+        col1, col2 = st.columns(2)
     
-    with col1:
-        # Working Hours Distribution
-        fig = px.histogram(filtered_df,
-                          x='Working_Hours_per_Week',
-                          nbins=20,
-                          color_discrete_sequence=[CHART_COLORS[1]],
-                          title="Distribution of Working Hours")
-        fig.update_layout(
-            **get_chart_layout(),
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with col1:
+            # Working Hours Distribution
+            show_figure('working_hours_distribution', view, perf)
     
-    with col2:
-        # Overtime Impact on Stress
-        overtime_threshold = filtered_df['Working_Hours_per_Week'].median()
-        filtered_df['Overtime'] = filtered_df['Working_Hours_per_Week'] > overtime_threshold
-        overtime_stress = filtered_df.groupby(['Department', 'Overtime'])['Stress_Level'].mean().reset_index()
-        fig = px.bar(overtime_stress,
-                    x='Department',
-                    y='Stress_Level',
-                    color='Overtime',
-                    barmode='group',
-                    color_discrete_sequence=[CHART_COLORS[2], CHART_COLORS[3]],
-                    title="Impact of Overtime on Stress Levels")
-        fig.update_layout(
-            **get_chart_layout(),
-            height=400,
-            xaxis={'tickangle': 45}
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+        with col2:
+            # Overtime Impact on Stress
+            show_figure('overtime_stress', view, perf)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Sleep Analysis
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("😴 Sleep Pattern Analysis")
-    
-    # Create sleep categories
-    filtered_df['Sleep_Category'] = pd.cut(filtered_df['Sleep_Hours'],
-                                         bins=[0, 6, 7, 8, 12],
-                                         labels=['< 6 hours', '6-7 hours', '7-8 hours', '> 8 hours'])
+    if 'Sleep Pattern Analysis' in visible_sections:
+        perf.section('Sleep Pattern Analysis', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("😴 Sleep Pattern Analysis")
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        # Sleep Distribution
-        sleep_dist = filtered_df['Sleep_Category'].value_counts().reset_index()
-        fig = px.pie(sleep_dist,
-                    values='count',
-                    names='Sleep_Category',
-                    color_discrete_sequence=CHART_COLORS,
-                    title="Sleep Duration Distribution")
-        fig.update_layout(
-            **get_chart_layout(),
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        with col1:
+            # Sleep Distribution
+            show_figure('sleep_distribution', view, perf)
     
-    with col2:
-        # Sleep vs Stress
-        sleep_stress = filtered_df.groupby('Sleep_Category')['Stress_Level'].mean().reset_index()
-        fig = px.bar(sleep_stress,
-                    x='Sleep_Category',
-                    y='Stress_Level',
-                    color_discrete_sequence=[CHART_COLORS[4]],
-                    title="Average Stress Level by Sleep Duration")
-        fig.update_layout(
-            **get_chart_layout(),
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+        with col2:
+            # Sleep vs Stress
+            show_figure('sleep_stress', view, perf)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Health Impact Analysis
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("🏥 Health Impact Analysis")
-    
-    # Create health-related metrics
-    filtered_df['Sleep_Quality'] = pd.cut(filtered_df['Sleep_Hours'],
-                                        bins=[0, 5, 6, 7, 8, 12],
-                                        labels=['Very Poor', 'Poor', 'Fair', 'Good', 'Excellent'])
-    
-    filtered_df['Burnout_Risk'] = pd.cut(filtered_df['Stress_Level'],
-                                       bins=[0, 3, 6, 8, 10],
-                                       labels=['Low', 'Moderate', 'High', 'Severe'])
+    if 'Health Impact Analysis' in visible_sections:
+        perf.section('Health Impact Analysis', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("🏥 Health Impact Analysis")
     
-    # Create tabs for different health aspects
-    health_tab1, health_tab2, health_tab3 = st.tabs([
-        "😴 Sleep Impact", 
-        "🏃‍♂️ Physical Activity", 
-        "🔥 Burnout Analysis"
-    ])
+        # Create tabs for different health aspects
+        health_tabs = [
+            "😴 Sleep Impact", 
+            "🏃‍♂️ Physical Activity", 
+            "🔥 Burnout Analysis"
+        ]
+        health_tab = lazy_tabs(health_tabs, key='health_tab')
     
-    with health_tab1:
-        col1, col2 = st.columns(2)
+        if health_tab == health_tabs[0]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Sleep Quality vs Stress
-            sleep_impact = filtered_df.groupby('Sleep_Quality')['Stress_Level'].agg([
-                'mean', 'count', 'std'
-            ]).reset_index()
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                x=sleep_impact['Sleep_Quality'],
-                y=sleep_impact['mean'],
-                error_y=dict(type='data', array=sleep_impact['std']),
-                marker_color=CHART_COLORS[0],
-                name='Average Stress'
-            ))
-            
-            fig.update_layout(
-                **get_chart_layout(),
-                title="Sleep Quality Impact on Stress",
-                height=400,
-                xaxis_title="Sleep Quality",
-                yaxis_title="Average Stress Level"
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Sleep Quality vs Stress
+                show_figure('sleep_quality_impact', view, perf)
             
-        with col2:
-            # Sleep Pattern Analysis
-            try:
-                fig = px.scatter(filtered_df,
-                               x='Sleep_Hours',
-                               y='Stress_Level',
-                               color='Department',
-                               trendline="lowess",
-                               color_discrete_sequence=CHART_COLORS,
-                               title="Sleep Hours vs Stress Level Trend")
-            except:
-                # Fallback without trendline if statsmodels is not available
-                fig = px.scatter(filtered_df,
-                               x='Sleep_Hours',
-                               y='Stress_Level',
-                               color='Department',
-                               color_discrete_sequence=CHART_COLORS,
-                               title="Sleep Hours vs Stress Level Trend")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Sleep Pattern Analysis
+                show_figure('sleep_stress_trend', view, perf)
     
-    with health_tab2:
-        col1, col2 = st.columns(2)
+        if health_tab == health_tabs[1]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Physical Activity Impact
-            filtered_df['Activity_Level'] = pd.qcut(filtered_df['Working_Hours_per_Week'],
-                                                  q=4,
-                                                  labels=['Low', 'Moderate', 'High', 'Very High'])
-            
-            activity_impact = filtered_df.groupby('Activity_Level')['Stress_Level'].mean().reset_index()
-            fig = px.line(activity_impact,
-                         x='Activity_Level',
-                         y='Stress_Level',
-                         markers=True,
-                         color_discrete_sequence=[CHART_COLORS[2]],
-                         title="Physical Activity Level vs Stress")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Physical Activity Impact
+                show_figure('activity_stress', view, perf)
             
-        with col2:
-            # Department-wise Activity Analysis
-            fig = px.box(filtered_df,
-                        x='Department',
-                        y='Working_Hours_per_Week',
-                        color='Department',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Working Hours Distribution by Department")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45},
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Department-wise Activity Analysis
+                show_figure('department_hours', view, perf)
     
-    with health_tab3:
-        col1, col2 = st.columns(2)
+        if health_tab == health_tabs[2]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Burnout Risk Distribution
-            burnout_dist = filtered_df['Burnout_Risk'].value_counts().reset_index()
-            fig = px.pie(burnout_dist,
-                        values='count',
-                        names='Burnout_Risk',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Burnout Risk Distribution")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        with col2:
-            # Burnout Factors Analysis
-            burnout_factors = pd.melt(filtered_df,
-                                    value_vars=['Working_Hours_per_Week', 'Sleep_Hours', 'Work_Life_Balance'],
-                                    var_name='Factor',
-                                    value_name='Value')
+            with col1:
+                # Burnout Risk Distribution
+                show_figure('burnout_distribution', view, perf)
             
-            fig = px.box(burnout_factors,
-                        x='Factor',
-                        y='Value',
-                        color='Factor',
-                        color_discrete_sequence=CHART_COLORS[3:6],
-                        title="Key Burnout Factors Analysis")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Burnout Factors Analysis
+                show_figure('burnout_factors', view, perf)
     
-    # Add health insights summary
-    st.markdown("""
-        <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
-            <h4 style='color: #334155; margin-bottom: 0.5rem;'>Key Health Insights:</h4>
-            <ul style='color: #64748b; margin: 0;'>
-                <li>Sleep quality shows a strong correlation with stress levels</li>
-                <li>Physical activity levels vary significantly across departments</li>
-                <li>Multiple factors contribute to burnout risk</li>
-            </ul>
-        </div>
-    """, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+        # Add health insights summary
+        st.markdown("""
+            <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
+                <h4 style='color: #334155; margin-bottom: 0.5rem;'>Key Health Insights:</h4>
+                <ul style='color: #64748b; margin: 0;'>
+                    <li>Sleep quality shows a strong correlation with stress levels</li>
+                    <li>Physical activity levels vary significantly across departments</li>
+                    <li>Multiple factors contribute to burnout risk</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Additional insights with tabs
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    tab1, tab2, tab3 = st.tabs(["📱 Remote Work Analysis", "⚖️ Work-Life Balance", "👥 Age Demographics"])
+    if 'Additional Insights' in visible_sections:
+        perf.section('Additional Insights', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        insight_tabs = ["📱 Remote Work Analysis", "⚖️ Work-Life Balance", "👥 Age Demographics"]
+        insight_tab = lazy_tabs(insight_tabs, key='insight_tab')
     
-    with tab1:
-        remote_stress = filtered_df.groupby('Remote_Work')['Stress_Level'].mean()
-        remote_df = pd.DataFrame({
-            'Remote_Work': remote_stress.index,
-            'Average_Stress': remote_stress.values
-        })
-        fig = px.bar(remote_df, x='Remote_Work', y='Average_Stress',
-                     labels={'x': 'Remote Work', 'y': 'Average Stress Level'},
-                     color_discrete_sequence=[CHART_COLORS[2]],
-                     text=remote_stress.values.round(2),
-                     title="")
-        fig.update_layout(
-            **get_chart_layout(),
-            bargap=0.3,
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if insight_tab == insight_tabs[0]:
+            show_figure('remote_stress', view, perf)
+            show_significance('remote_stress', view)
         
-    with tab2:
-        fig = px.scatter(filtered_df, 
-                       x='Work_Life_Balance', 
-                       y='Stress_Level',
-                       color='Department',
-                       color_discrete_sequence=CHART_COLORS,
-                       opacity=0.7,
-                       size='Experience_Years',
-                       hover_data=['Job_Role', 'Age'],
-                       title="")
-        fig.update_layout(
-            **get_chart_layout(),
-            hovermode='closest',
-            showlegend=True,
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if insight_tab == insight_tabs[1]:
+            show_figure('balance_stress', view, perf)
         
-    with tab3:
-        col1, col2 = st.columns(2)
+        if insight_tab == insight_tabs[2]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Age Distribution by Department
-            fig = px.violin(filtered_df, 
-                           y='Age', 
-                           x='Department',
-                           color='Department',
-                           box=True,
-                           color_discrete_sequence=CHART_COLORS,
-                           title="Age Distribution by Department")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Age Distribution by Department
+                show_figure('age_distribution', view, perf)
             
-        with col2:
-            # Stress Level by Age Group
-            filtered_df['Age_Group'] = pd.cut(filtered_df['Age'], 
-                                           bins=[20, 30, 40, 50, 60],
-                                           labels=['20-30', '31-40', '41-50', '51-60'])
-            age_stress = filtered_df.groupby('Age_Group')['Stress_Level'].mean().reset_index()
-            fig = px.line(age_stress, 
-                         x='Age_Group', 
-                         y='Stress_Level',
-                         markers=True,
-                         color_discrete_sequence=[CHART_COLORS[0]],
-                         title="Average Stress Level by Age Group")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Stress Level by Age Group
+                show_figure('age_group_stress', view, perf)
 
     # Workplace Dynamics Analysis
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("🏢 Workplace Dynamics")
+    if 'Workplace Dynamics' in visible_sections:
+        perf.section('Workplace Dynamics', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("🏢 Workplace Dynamics")
     
-    workplace_tab1, workplace_tab2, workplace_tab3 = st.tabs([
-        "🏠 Remote Work Impact", 
-        "🏢 Department Analysis", 
-        "📊 Team Size Effects"
-    ])
+        workplace_tabs = [
+            "🏠 Remote Work Impact", 
+            "🏢 Department Analysis", 
+            "📊 Team Size Effects"
+        ]
+        workplace_tab = lazy_tabs(workplace_tabs, key='workplace_tab')
     
-    with workplace_tab1:
-        col1, col2 = st.columns(2)
+        if workplace_tab == workplace_tabs[0]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Remote Work vs Stress
-            remote_work_stress = filtered_df.groupby(['Remote_Work', 'Department'])['Stress_Level'].mean().reset_index()
-            fig = px.bar(remote_work_stress,
-                        x='Department',
-                        y='Stress_Level',
-                        color='Remote_Work',
-                        barmode='group',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Stress Levels: Remote vs Office Work")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Remote Work vs Stress
+                show_figure('remote_department_stress', view, perf)
             
-        with col2:
-            # Work-Life Balance in Remote vs Office
-            remote_balance = filtered_df.groupby('Remote_Work')['Work_Life_Balance'].mean().reset_index()
-            fig = px.pie(remote_balance,
-                        values='Work_Life_Balance',
-                        names='Remote_Work',
-                        hole=0.4,
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Work-Life Balance Distribution")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Work-Life Balance in Remote vs Office
+                show_figure('remote_balance', view, perf)
     
-    with workplace_tab2:
-        col1, col2 = st.columns(2)
+        if workplace_tab == workplace_tabs[1]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Department Performance Matrix
-            dept_matrix = filtered_df.groupby('Department').agg({
-                'Stress_Level': 'mean',
-                'Working_Hours_per_Week': 'mean',
-                'Monthly_Salary_INR': 'mean'
-            }).reset_index()
-            
-            fig = px.scatter(dept_matrix,
-                           x='Working_Hours_per_Week',
-                           y='Stress_Level',
-                           size='Monthly_Salary_INR',
-                           color='Department',
-                           color_discrete_sequence=CHART_COLORS,
-                           title="Department Performance Matrix")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Department Performance Matrix
+                show_figure('department_matrix', view, perf)
             
-        with col2:
-            # Department Stress Distribution
-            fig = px.violin(filtered_df,
-                          y='Stress_Level',
-                          x='Department',
-                          color='Department',
-                          box=True,
-                          points="all",
-                          color_discrete_sequence=CHART_COLORS,
-                          title="Detailed Department Stress Distribution")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                showlegend=False,
-                xaxis={'tickangle': 45}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Department Stress Distribution
+                show_figure('department_stress_violin', view, perf)
     
-    with workplace_tab3:
-        col1, col2 = st.columns(2)
+        if workplace_tab == workplace_tabs[2]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Team Size Impact
-            # Calculate department sizes
-            dept_sizes = filtered_df['Department'].value_counts()
-            size_mapping = {}
-            
-            # Manual categorization based on department sizes
-            for dept in dept_sizes.index:
-                # Since all departments have equal size (~2,730 employees)
-                size_mapping[dept] = 'Standard'
-            
-            # Map sizes to departments
-            filtered_df.loc[:, 'Team_Size'] = filtered_df['Department'].map(size_mapping)
-            
-            team_stress = filtered_df.groupby(['Team_Size', 'Department'])['Stress_Level'].mean().reset_index()
-            fig = px.bar(team_stress,
-                        x='Department',
-                        y='Stress_Level',
-                        color='Team_Size',
-                        barmode='group',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Department Stress Levels by Size Category")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45}
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        with col2:
-            # Efficiency Metrics
-            efficiency_metrics = filtered_df.groupby('Team_Size').agg({
-                'Working_Hours_per_Week': 'mean',
-                'Work_Life_Balance': 'mean',
-                'Stress_Level': 'mean'
-            }).reset_index()
-            
-            efficiency_metrics_long = pd.melt(efficiency_metrics,
-                                         id_vars=['Team_Size'],
-                                         var_name='Metric',
-                                         value_name='Value')
+            with col1:
+                # Team Size Impact
+                show_figure('team_size_stress', view, perf)
             
-            fig = px.line(efficiency_metrics_long,
-                        x='Team_Size',
-                        y='Value',
-                        color='Metric',
-                        markers=True,
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Size Category Impact on Key Metrics")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Efficiency Metrics
+                show_figure('team_size_metrics', view, perf)
 
-    # Add workplace insights summary
-    st.markdown("""
-        <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
-            <h4 style='color: #334155; margin-bottom: 0.5rem;'>Workplace Insights:</h4>
-            <ul style='color: #64748b; margin: 0;'>
-                <li>Remote work shows varying impact across departments</li>
-                <li>Department size correlates with stress levels</li>
-                <li>Work-life balance differs between remote and office settings</li>
-            </ul>
-        </div>
-    """, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+        # Add workplace insights summary
+        st.markdown("""
+            <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
+                <h4 style='color: #334155; margin-bottom: 0.5rem;'>Workplace Insights:</h4>
+                <ul style='color: #64748b; margin: 0;'>
+                    <li>Remote work shows varying impact across departments</li>
+                    <li>Department size correlates with stress levels</li>
+                    <li>Work-life balance differs between remote and office settings</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Discrimination Analysis
-    st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
-    st.subheader("⚖️ Workplace Equality Analysis")
+    if 'Workplace Equality Analysis' in visible_sections:
+        perf.section('Workplace Equality Analysis', rows=len(selection))
+        st.markdown("<div class='chart-container'>", unsafe_allow_html=True)
+        st.subheader("⚖️ Workplace Equality Analysis")
     
-    equality_tab1, equality_tab2, equality_tab3 = st.tabs([
-        "👥 Gender Analysis", 
-        "💼 Job Satisfaction", 
-        "🏢 Department Patterns"
-    ])
+        equality_tabs = [
+            "👥 Gender Analysis", 
+            "💼 Job Satisfaction", 
+            "🏢 Department Patterns"
+        ]
+        equality_tab = lazy_tabs(equality_tabs, key='equality_tab')
     
-    with equality_tab1:
-        col1, col2 = st.columns(2)
+        if equality_tab == equality_tabs[0]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Gender-based Stress Analysis
-            gender_dept_stress = filtered_df.groupby(['Gender', 'Department'])['Stress_Level'].mean().reset_index()
-            fig = px.bar(gender_dept_stress,
-                        x='Department',
-                        y='Stress_Level',
-                        color='Gender',
-                        barmode='group',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Stress Levels by Gender Across Departments")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Gender-based Stress Analysis
+                show_figure('gender_department_stress', view, perf)
+                show_significance('gender_department_stress', view)
             
-        with col2:
-            # Salary Distribution by Gender
-            fig = px.box(filtered_df,
-                        x='Gender',
-                        y='Monthly_Salary_INR',
-                        color='Gender',
-                        points="all",
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Salary Distribution by Gender")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                showlegend=False
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Salary Distribution by Gender
+                show_figure('gender_salary', view, perf)
+
+            # Add note about gender distribution
+            st.markdown("""
+                <div style='margin-bottom: 1rem; padding: 1rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
+                    <p style='margin: 0; color: #64748b; font-size: 0.9rem;'>
+                    The data shows nearly equal representation and similar stress levels across genders,
+                    which might indicate effective workplace equality policies or data standardization.
+                    </p>
+                </div>
+            """, unsafe_allow_html=True)
     
-    with equality_tab2:
-        col1, col2 = st.columns(2)
+        if equality_tab == equality_tabs[1]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Work-Life Balance by Gender
-            balance_gender = filtered_df.groupby(['Gender', 'Work_Life_Balance'])['Stress_Level'].mean().reset_index()
-            fig = px.line(balance_gender,
-                         x='Work_Life_Balance',
-                         y='Stress_Level',
-                         color='Gender',
-                         markers=True,
-                         color_discrete_sequence=CHART_COLORS,
-                         title="Work-Life Balance Impact by Gender")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col1:
+                # Work-Life Balance by Gender
+                show_figure('gender_balance', view, perf)
             
-        with col2:
-            # Experience vs Salary by Gender
-            fig = px.scatter(filtered_df,
-                           x='Experience_Years',
-                           y='Monthly_Salary_INR',
-                           color='Gender',
-                           color_discrete_sequence=CHART_COLORS,
-                           title="Experience-Salary Relationship by Gender")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Experience vs Salary by Gender
+                show_figure('experience_salary', view, perf)
     
-    with equality_tab3:
-        col1, col2 = st.columns(2)
+        if equality_tab == equality_tabs[2]:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Department Gender Distribution
-            dept_gender = pd.crosstab(filtered_df['Department'], 
-                                   filtered_df['Gender'], 
-                                   normalize='index') * 100
-            dept_gender_long = dept_gender.reset_index().melt(id_vars=['Department'],
-                                                           var_name='Gender',
-                                                           value_name='Percentage')
+            with col1:
+                # Department Gender Distribution
+                show_figure('department_gender_share', view, perf)
             
-            fig = px.bar(dept_gender_long,
-                        x='Department',
-                        y='Percentage',
-                        color='Gender',
-                        barmode='stack',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Gender Distribution by Department (%)")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45},
-                yaxis_title="Percentage (%)"
-            )
-            st.plotly_chart(fig, use_container_width=True)
-            
-        with col2:
-            # Promotion Rate Analysis
-            filtered_df['Promotion_Rate'] = filtered_df['Monthly_Salary_INR'] / (filtered_df['Experience_Years'] + 1)
-            fig = px.box(filtered_df,
-                        x='Department',
-                        y='Promotion_Rate',
-                        color='Gender',
-                        color_discrete_sequence=CHART_COLORS,
-                        title="Career Progression Analysis")
-            fig.update_layout(
-                **get_chart_layout(),
-                height=400,
-                xaxis={'tickangle': 45}
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                # Promotion Rate Analysis
+                show_figure('career_progression', view, perf)
 
-    # Add equality insights summary
-    st.markdown("""
-        <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
-            <h4 style='color: #334155; margin-bottom: 0.5rem;'>Equality Insights:</h4>
-            <ul style='color: #64748b; margin: 0;'>
-                <li>Analysis of gender-based stress patterns across departments</li>
-                <li>Examination of salary distributions and career progression</li>
-                <li>Assessment of work-life balance variations by gender</li>
-                <li>Department-wise representation and promotion patterns</li>
-            </ul>
-        </div>
-    """, unsafe_allow_html=True)
-    st.markdown("</div>", unsafe_allow_html=True)
+        # Add equality insights summary
+        st.markdown("""
+            <div style='margin-top: 1rem; padding: 1.5rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
+                <h4 style='color: #334155; margin-bottom: 0.5rem;'>Equality Insights:</h4>
+                <ul style='color: #64748b; margin: 0;'>
+                    <li>Analysis of gender-based stress patterns across departments</li>
+                    <li>Examination of salary distributions and career progression</li>
+                    <li>Assessment of work-life balance variations by gender</li>
+                    <li>Department-wise representation and promotion patterns</li>
+                </ul>
+            </div>
+        """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
 
     # Add a note about the department analysis
+    perf.section('Notes and footer')
     st.markdown("""
         <div style='margin-top: 1rem; padding: 1rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
             <p style='margin: 0; color: #64748b; font-size: 0.9rem;'>
@@ -1040,19 +687,14 @@ def main():
         </div>
     """, unsafe_allow_html=True)
 
-    with equality_tab1:
-        # Add note about gender distribution
-        st.markdown("""
-            <div style='margin-bottom: 1rem; padding: 1rem; background-color: #f8f9fa; border-radius: 0.5rem;'>
-                <p style='margin: 0; color: #64748b; font-size: 0.9rem;'>
-                The data shows nearly equal representation and similar stress levels across genders,
-                which might indicate effective workplace equality policies or data standardization.
-                </p>
-            </div>
-        """, unsafe_allow_html=True)
-
     # Add the footer at the very end
     render_footer()
 
+    perf.finish()
+    if show_performance:
+        render_performance_panel(perf)
+    if PERFORMANCE_LOG_PATH:
+        perf.export(PERFORMANCE_LOG_PATH)
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,69 +1,196 @@
-import pandas as pd
-import matplotlib.pyplot as plt
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import seaborn as sns
 import numpy as np
+from matplotlib.figure import Figure
+from data_loader import expand_sources, load_dataset, load_partitions
+from aggregation import CorrelationAccumulator, aggregate, aggregate_frame, spec_requests
+from config import HOURS_SAMPLE_SIZE, NUMERIC_COLUMNS, REPORT_DPI, REPORT_FORMATS, REPORT_OUTPUT_DIR
 
 def load_data(filepath):
-    """Load and return the corporate stress dataset"""
-    return pd.read_csv(filepath)
+    """Load and return the corporate stress dataset from a file, directory or glob of partitions"""
+    paths = expand_sources(filepath)
+    if len(paths) == 1:
+        return load_dataset(paths[0])
+    return load_partitions(paths)
 
-def plot_stress_distribution(df):
-    """Plot the overall distribution of stress levels"""
-    plt.figure(figsize=(12, 6))
-    sns.histplot(data=df, x='Stress_Level', bins=11)
-    plt.title('Distribution of Stress Levels')
-    plt.xlabel('Stress Level (0-10)')
-    plt.ylabel('Count')
-    plt.savefig('outputs/stress_distribution.png')
-    plt.close()
-
-def calculate_stress_metrics(df):
-    """Calculate key stress-related metrics"""
-    metrics = {
-        'Overall': df['Stress_Level'].mean(),
-        'By Gender': df.groupby('Gender')['Stress_Level'].mean(),
-        'By Department': df.groupby('Department')['Stress_Level'].mean(),
-        'By Remote Work': df.groupby('Remote_Work')['Stress_Level'].mean()
+# Group statistics behind calculate_stress_metrics, as (group key, column, statistic)
+STRESS_METRIC_REQUESTS = {
+    'Overall': (None, 'Stress_Level', 'mean'),
+    'By Gender': ('Gender', 'Stress_Level', 'mean'),
+    'By Department': ('Department', 'Stress_Level', 'mean'),
+    'By Remote Work': ('Remote_Work', 'Stress_Level', 'mean')
+}
+
+# Aggregation specs behind analyze_workplace_dynamics, per group key
+WORKPLACE_DYNAMICS_SPECS = {
+    'Remote_Work': {
+        'Stress_Level': ['mean', 'std', 'count'],
+        'Work_Life_Balance': 'mean'
+    },
+    'Department': {
+        'Stress_Level': ['mean', 'std'],
+        'Working_Hours_per_Week': 'mean',
+        'Monthly_Salary_INR': 'mean'
     }
-    return metrics
+}
+
+def calculate_stress_metrics(df, results=None):
+    """Calculate key stress-related metrics"""
+    if results is None:
+        results = aggregate(df, STRESS_METRIC_REQUESTS.values())
+    return {name: results[request] for name, request in STRESS_METRIC_REQUESTS.items()}
 
-def analyze_correlations(df):
+def analyze_correlations(df, accumulator=None):
     """Analyze correlations with stress levels"""
-    return df[['Stress_Level', 'Age', 'Working_Hours_per_Week', 
-               'Monthly_Salary_INR', 'Sleep_Hours', 'Work_Life_Balance']].corr()['Stress_Level']
+    if accumulator is None:
+        accumulator = CorrelationAccumulator.from_frame(df, NUMERIC_COLUMNS)
+    return accumulator.correlation()['Stress_Level']
+
+def count_box_stats(counts, whis=1.5):
+    """
+    Box plot statistics (as used by Axes.bxp) for values given as a Series of counts.
+    Quartiles interpolate linearly like np.percentile on the repeated values.
+    """
+    counts = counts[counts > 0].sort_index()
+    values = counts.index.to_numpy(dtype='float64')
+    cumulative = np.cumsum(counts.to_numpy())
+    total = cumulative[-1]
+    value_at = lambda rank: values[np.searchsorted(cumulative, rank, side='right')]
+
+    def quantile(q):
+        position = q * (total - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, total - 1)
+        return value_at(lower) + (value_at(upper) - value_at(lower)) * (position - lower)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    low, high = q1 - whis * (q3 - q1), q3 + whis * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {
+        'q1': q1, 'med': median, 'q3': q3,
+        'whislo': inside.min(), 'whishi': inside.max(),
+        'fliers': values[(values < low) | (values > high)]
+    }
+
+def stress_distribution_figure(counts):
+    """Histogram of stress levels from a Series of counts per level"""
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    sns.histplot(x=counts.index.to_numpy(dtype='float64'), weights=counts.to_numpy(), bins=11, ax=ax)
+    ax.set_title('Distribution of Stress Levels')
+    ax.set_xlabel('Stress Level (0-10)')
+    ax.set_ylabel('Count')
+    return fig
+
+def department_stress_figure(counts):
+    """Box plot of stress levels by department from counts indexed by (Department, Stress_Level)"""
+    departments = sorted(counts.index.get_level_values(0).unique())
+    stats = []
+    for department in departments:
+        stats.append(dict(count_box_stats(counts.xs(department, level=0)), label=department))
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    lines = {'color': '0.25', 'linewidth': 1.5}
+    boxes = ax.bxp(stats, widths=0.8, patch_artist=True,
+                   boxprops={'edgecolor': '0.25', 'linewidth': 1.5}, whiskerprops=lines,
+                   capprops=lines, medianprops=lines, flierprops={'markerfacecolor': '0.25'})
+    for patch, color in zip(boxes['boxes'], sns.color_palette(n_colors=len(stats), desat=0.75)):
+        patch.set_facecolor(color)
+    ax.set_xlabel('Department')
+    ax.set_ylabel('Stress_Level')
+    ax.set_title('Stress Levels by Department')
+    ax.tick_params(axis='x', labelrotation=45)
+    return fig
+
+def hours_stress_figure(sample):
+    """Scatter of working hours against stress for a sample of employees"""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    sns.scatterplot(data=sample, x='Working_Hours_per_Week', y='Stress_Level', alpha=0.5, ax=ax)
+    ax.set_title('Working Hours vs Stress Level')
+    return fig
 
-def plot_department_stress(df):
+# Report plots by output name; each builds a figure from a small summary of the data
+REPORT_PLOTS = {
+    'stress_distribution': stress_distribution_figure,
+    'department_stress': department_stress_figure,
+    'hours_stress': hours_stress_figure
+}
+
+def report_plot_inputs(df):
+    """Summaries of a frame the report plots are drawn from"""
+    return {
+        'stress_distribution': df['Stress_Level'].value_counts(),
+        'department_stress': df.groupby(['Department', 'Stress_Level']).size(),
+        'hours_stress': df.sample(min(HOURS_SAMPLE_SIZE, len(df)))
+    }
+
+def save_figure(fig, name, formats=REPORT_FORMATS, dpi=REPORT_DPI, output_dir=REPORT_OUTPUT_DIR):
+    """Write a figure once per output format and return the written paths"""
+    paths = []
+    for fmt in formats:
+        path = os.path.join(output_dir, f'{name}.{fmt}')
+        fig.savefig(path, format=fmt, dpi=dpi)
+        paths.append(path)
+    return paths
+
+def render_plot(name, data, formats=REPORT_FORMATS, dpi=REPORT_DPI, output_dir=REPORT_OUTPUT_DIR):
+    """Build and save one report plot"""
+    return save_figure(REPORT_PLOTS[name](data), name, formats, dpi, output_dir)
+
+def render_report_plots(inputs, workers=None, formats=REPORT_FORMATS, dpi=REPORT_DPI,
+                        output_dir=REPORT_OUTPUT_DIR):
+    """
+    Render the report plots concurrently in worker processes.
+    Figures use the object-oriented API with no pyplot state, and workers only
+    receive the small per-plot summaries. workers=1 renders in this process.
+    """
+    if workers == 1:
+        return {name: render_plot(name, data, formats, dpi, output_dir) for name, data in inputs.items()}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(render_plot, name, data, formats, dpi, output_dir)
+                   for name, data in inputs.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+def plot_stress_distribution(df, formats=REPORT_FORMATS, dpi=REPORT_DPI):
+    """Plot the overall distribution of stress levels"""
+    render_plot('stress_distribution', df['Stress_Level'].value_counts(), formats, dpi)
+
+def plot_department_stress(df, formats=REPORT_FORMATS, dpi=REPORT_DPI):
     """Plot stress levels by department"""
-    plt.figure(figsize=(12, 6))
-    sns.boxplot(data=df, x='Department', y='Stress_Level')
-    plt.title('Stress Levels by Department')
-    plt.xticks(rotation=45)
-    plt.savefig('outputs/department_stress.png')
-    plt.close()
-
-def plot_hours_stress(df):
+    render_plot('department_stress', df.groupby(['Department', 'Stress_Level']).size(), formats, dpi)
+
+def plot_hours_stress(df, formats=REPORT_FORMATS, dpi=REPORT_DPI):
     """Plot relationship between working hours and stress"""
-    plt.figure(figsize=(10, 6))
-    sns.scatterplot(data=df.sample(1000), x='Working_Hours_per_Week', y='Stress_Level', alpha=0.5)
-    plt.title('Working Hours vs Stress Level')
-    plt.savefig('outputs/hours_stress.png')
-    plt.close()
+    render_plot('hours_stress', df.sample(min(HOURS_SAMPLE_SIZE, len(df))), formats, dpi)
 
-def analyze_workplace_dynamics(df):
+def analyze_workplace_dynamics(df, results=None):
     """
     Analyze workplace dynamics including remote work, department stress, and company size impact
     """
+    if results is None:
+        results = aggregate(df, [request for key, spec in WORKPLACE_DYNAMICS_SPECS.items()
+                                 for request in spec_requests(key, spec)])
+
     # Remote work analysis
-    remote_stats = df.groupby('Remote_Work').agg({
-        'Stress_Level': ['mean', 'std', 'count'],
-        'Work_Life_Balance': 'mean'
-    }).round(2)
+    remote_stats = aggregate_frame(df, 'Remote_Work', WORKPLACE_DYNAMICS_SPECS['Remote_Work'],
+                                   results).round(2)
     
     # Department analysis
-    dept_stats = df.groupby('Department').agg({
-        'Stress_Level': ['mean', 'std'],
-        'Working_Hours_per_Week': 'mean',
-        'Monthly_Salary_INR': 'mean'
-    }).round(2)
+    dept_stats = aggregate_frame(df, 'Department', WORKPLACE_DYNAMICS_SPECS['Department'],
+                                 results).round(2)
     
-    return remote_stats, dept_stats 
\ No newline at end of file
+    return remote_stats, dept_stats
+
+def stress_report(df):
+    """
+    Compute calculate_stress_metrics and analyze_workplace_dynamics together
+    in a single aggregation sweep over the frame
+    """
+    requests = list(STRESS_METRIC_REQUESTS.values())
+    for key, spec in WORKPLACE_DYNAMICS_SPECS.items():
+        requests += spec_requests(key, spec)
+    results = aggregate(df, requests)
+    return calculate_stress_metrics(df, results), analyze_workplace_dynamics(df, results)
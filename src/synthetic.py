@@ -0,0 +1,81 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Category values and their shares in the survey extract
+GENDERS = (['Male', 'Female', 'Other'], [0.34, 0.33, 0.33])
+MARITAL_STATUSES = (['Single', 'Married', 'Divorced', 'Widowed'], [0.4, 0.45, 0.1, 0.05])
+JOB_ROLES = (['Analyst', 'Clerk', 'Engineer', 'Manager'], [0.25, 0.25, 0.25, 0.25])
+REMOTE_WORK = (['Yes', 'No', 'Hybrid'], [0.33, 0.34, 0.33])
+DEPARTMENTS = (['Finance', 'HR', 'IT', 'Legal', 'Marketing', 'Operations', 'Sales'], [1 / 7] * 7)
+
+# Median monthly salary per job role, in INR
+ROLE_SALARIES = {'Analyst': 70000, 'Clerk': 35000, 'Engineer': 95000, 'Manager': 140000}
+
+# Rows generated per block when writing large files
+_BLOCK_ROWS = 1000000
+
+
+def _choice(rng, values_and_shares, size):
+    values, shares = values_and_shares
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=shares)]
+
+
+def generate_dataset(n_rows, seed=0, start_id=0):
+    """
+    Generate a synthetic stress survey with the columns and value ranges of the
+    corporate stress dataset. Salaries follow job role and experience, stress
+    rises mildly with working hours and falls with sleep and work-life balance.
+    """
+    rng = np.random.default_rng(seed)
+    age = rng.integers(22, 60, n_rows)
+    experience = rng.integers(0, np.minimum(age - 21, 41))
+    role = _choice(rng, JOB_ROLES, n_rows)
+    base_salary = pd.Series(role).map(ROLE_SALARIES).to_numpy(dtype='float64')
+    salary = base_salary * (1 + 0.03 * experience) * rng.lognormal(0, 0.25, n_rows)
+    hours = rng.integers(30, 70, n_rows)
+    sleep = np.clip(np.round(rng.normal(7, 1.5, n_rows) - 0.02 * (hours - 50), 1), 3.0, 11.0)
+    balance = rng.integers(1, 11, n_rows)
+    stress = np.rint(5 + 0.04 * (hours - 50) - 0.15 * (sleep - 7) - 0.1 * (balance - 5.5)
+                     + rng.normal(0, 3, n_rows))
+    return pd.DataFrame({
+        'ID': np.arange(start_id, start_id + n_rows),
+        'Age': age,
+        'Gender': _choice(rng, GENDERS, n_rows),
+        'Marital_Status': _choice(rng, MARITAL_STATUSES, n_rows),
+        'Job_Role': role,
+        'Experience_Years': experience,
+        'Monthly_Salary_INR': np.round(salary, 2),
+        'Working_Hours_per_Week': hours,
+        'Remote_Work': _choice(rng, REMOTE_WORK, n_rows),
+        'Stress_Level': np.clip(stress, 0, 10).astype(np.int64),
+        'Department': _choice(rng, DEPARTMENTS, n_rows),
+        'Sleep_Hours': sleep,
+        'Work_Life_Balance': balance,
+        'Team_Size': rng.integers(3, 50, n_rows),
+        'Overtime': np.where(hours > 45, 'Yes', 'No').astype(object)
+    })
+
+
+def write_dataset(path, n_rows, seed=0):
+    """Write a synthetic dataset CSV in blocks, so any size fits in memory"""
+    seeds = np.random.SeedSequence(seed).spawn((n_rows + _BLOCK_ROWS - 1) // _BLOCK_ROWS)
+    for i, block_seed in enumerate(seeds):
+        start = i * _BLOCK_ROWS
+        block = generate_dataset(min(_BLOCK_ROWS, n_rows - start), block_seed, start_id=start)
+        block.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic corporate stress dataset')
+    parser.add_argument('path', help='output CSV path')
+    parser.add_argument('--rows', type=int, default=100000, help='number of employees')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    args = parser.parse_args()
+    write_dataset(args.path, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from caching import LRUCache
+from config import CHART_COLORS, LOWESS_BINS, LOWESS_FRAC, TRENDLINE_CACHE_SIZE
+
+# Fitted trendlines keyed by (cache key, x, y, group, frac, bins)
+_trend_cache = LRUCache(TRENDLINE_CACHE_SIZE)
+
+
+def binned_lowess(x, y, groups, n_groups, frac=LOWESS_FRAC, bins=LOWESS_BINS):
+    """
+    Approximate LOWESS for every group at once. Points are collapsed into `bins`
+    shared x bins (count, mean x, mean y), then a count-weighted local linear fit
+    with tricube weights is evaluated at each occupied bin. The span covers `frac`
+    of the group's points, as in statsmodels; robustifying iterations are skipped.
+    Cost is one pass over the rows plus O(groups * bins^2).
+    Returns (bin mean x, fitted y), both of shape (groups, bins), NaN where empty.
+    """
+    keep = ~(np.isnan(x) | np.isnan(y)) & (groups >= 0)
+    x, y, groups = x[keep], y[keep], groups[keep]
+    if not len(x):
+        empty = np.full((n_groups, bins), np.nan)
+        return empty, empty
+    lo, hi = x.min(), x.max()
+    width = (hi - lo) / bins if hi > lo else 1.0
+    cells = groups * bins + np.clip(((x - lo) / width).astype(np.int64), 0, bins - 1)
+    reduce = lambda weights: np.bincount(cells, weights=weights,
+                                         minlength=n_groups * bins).reshape(n_groups, bins)
+    counts = reduce(None)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centers = reduce(x) / counts
+        means = reduce(y) / counts
+
+    # Distance from every evaluation bin to every other bin of the same group
+    distance = np.abs(centers[:, :, None] - centers[:, None, :])
+    distance = np.where(np.isnan(distance), np.inf, distance)
+
+    # Bandwidth: distance within which frac of the group's points fall
+    order = np.argsort(distance, axis=2)
+    sorted_distance = np.take_along_axis(distance, order, axis=2)
+    reach = np.cumsum(np.take_along_axis(np.broadcast_to(counts[:, None, :], distance.shape),
+                                         order, axis=2), axis=2)
+    needed = np.ceil(frac * counts.sum(axis=1))[:, None, None]
+    kth = np.minimum((reach < needed).sum(axis=2, keepdims=True), bins - 1)
+    bandwidth = np.take_along_axis(sorted_distance, kth, axis=2)
+    bandwidth = np.where(np.isfinite(bandwidth) & (bandwidth > 0), bandwidth * 1.0001, 1.0)
+
+    scaled = np.clip(distance / bandwidth, 0.0, 1.0)
+    weights = counts[:, None, :] * (1 - scaled ** 3) ** 3
+    xs = np.nan_to_num(centers)[:, None, :]
+    ys = np.nan_to_num(means)[:, None, :]
+    s0 = weights.sum(axis=2)
+    s1 = (weights * xs).sum(axis=2)
+    s2 = (weights * xs * xs).sum(axis=2)
+    t0 = (weights * ys).sum(axis=2)
+    t1 = (weights * xs * ys).sum(axis=2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denominator = s0 * s2 - s1 * s1
+        slope = np.where(np.abs(denominator) > 1e-12 * s0 * s0, (s0 * t1 - s1 * t0) / denominator, 0.0)
+        fitted = (t0 + slope * (np.nan_to_num(centers) * s0 - s1)) / s0
+    fitted = np.where(counts > 0, fitted, np.nan)
+    return centers, fitted
+
+
+def lowess_trends(df, x, y, group=None, cache_key=None, frac=LOWESS_FRAC, bins=LOWESS_BINS):
+    """
+    Approximate LOWESS trendline of y on x per group, in order of appearance.
+    Returns {group label: DataFrame(x, y)}. With a `cache_key` (e.g. dataset
+    fingerprint plus filter state) results are reused across reruns.
+    """
+    def compute():
+        if group is None:
+            codes, labels = np.zeros(len(df), dtype=np.int64), [None]
+        else:
+            codes, labels = pd.factorize(df[group])
+        centers, fitted = binned_lowess(df[x].to_numpy(dtype='float64'),
+                                        df[y].to_numpy(dtype='float64'),
+                                        codes, len(labels), frac, bins)
+        trends = {}
+        for i, label in enumerate(labels):
+            occupied = ~np.isnan(fitted[i])
+            trends[label] = pd.DataFrame({x: centers[i][occupied], y: fitted[i][occupied]})
+        return trends
+
+    if cache_key is None:
+        return compute()
+    return _trend_cache.get_or_compute((cache_key, x, y, group, frac, bins), compute)
+
+
+def add_trendlines(fig, trends, color_discrete_sequence=CHART_COLORS):
+    """Overlay trendlines on a figure, colored like its per-group traces"""
+    for i, (label, trend) in enumerate(trends.items()):
+        columns = list(trend.columns)
+        fig.add_trace(go.Scatter(
+            x=trend[columns[0]], y=trend[columns[1]], mode='lines',
+            line={'color': color_discrete_sequence[i % len(color_discrete_sequence)], 'width': 2},
+            name=f'{label} trend' if label is not None else 'trend',
+            legendgroup=str(label), showlegend=False
+        ))
+    return fig
+
+
+def clear_trend_cache():
+    """Drop all cached trendlines"""
+    _trend_cache.clear()